@@ -0,0 +1,112 @@
+"""initial schema
+
+Revision ID: 001
+Revises:
+Create Date: 2024-01-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String()),
+        sa.Column('role', sa.Enum('ADMIN', 'USER', name='userrole')),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('is_active', sa.Boolean()),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    # own_team_id gets its foreign key once teams exists
+    op.create_table(
+        'projects',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('total_teams', sa.Integer()),
+        sa.Column('own_team_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_projects_id', 'projects', ['id'])
+
+    op.create_table(
+        'teams',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id')),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('initial_budget', sa.Float()),
+        sa.Column('remaining_budget', sa.Float()),
+        sa.Column('players_count', sa.Integer()),
+        sa.Column('color', sa.String()),
+    )
+    op.create_index('ix_teams_id', 'teams', ['id'])
+    op.create_foreign_key(
+        'projects_own_team_id_fkey', 'projects', 'teams', ['own_team_id'], ['id']
+    )
+
+    op.create_table(
+        'players',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id')),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('base_price', sa.Float()),
+        sa.Column('category', sa.String()),
+        sa.Column('role', sa.Enum('BAT', 'BWL', 'AR', 'WK', name='playerrole'), nullable=True),
+        sa.Column('points', sa.Integer(), nullable=True),
+        sa.Column('status', sa.Enum('UNSOLD', 'SOLD', name='playerstatus')),
+        sa.Column('current_team_id', sa.Integer(), sa.ForeignKey('teams.id'), nullable=True),
+        sa.Column('sold_price', sa.Float(), nullable=True),
+        sa.Column('sold_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_players_id', 'players', ['id'])
+    op.create_index('idx_project_status', 'players', ['project_id', 'status'])
+
+    op.create_table(
+        'auctions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id')),
+        sa.Column('player_id', sa.Integer(), sa.ForeignKey('players.id'), unique=True),
+        sa.Column('team_id', sa.Integer(), sa.ForeignKey('teams.id')),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('timestamp', sa.DateTime()),
+        sa.Column('is_reverted', sa.Boolean()),
+    )
+    op.create_index('ix_auctions_id', 'auctions', ['id'])
+
+    op.create_table(
+        'audit_logs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id')),
+        sa.Column('action', sa.String()),
+        sa.Column('details', sa.String()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id')),
+    )
+    op.create_index('ix_audit_logs_id', 'audit_logs', ['id'])
+
+
+def downgrade():
+    op.drop_table('audit_logs')
+    op.drop_table('auctions')
+    op.drop_table('players')
+    op.drop_constraint('projects_own_team_id_fkey', 'projects', type_='foreignkey')
+    op.drop_table('teams')
+    op.drop_table('projects')
+    op.drop_table('users')
+    sa.Enum(name='playerstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='playerrole').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='userrole').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,28 @@
+"""add squad size and budget feasibility to projects
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-01-03 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('projects', sa.Column('squad_size', sa.Integer(), nullable=True))
+    op.add_column(
+        'projects',
+        sa.Column('enforce_budget_feasibility', sa.Boolean(), server_default=sa.false(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column('projects', 'enforce_budget_feasibility')
+    op.drop_column('projects', 'squad_size')
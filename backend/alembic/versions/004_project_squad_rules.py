@@ -0,0 +1,23 @@
+"""add squad rules to projects
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-01-04 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('projects', sa.Column('squad_rules', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('projects', 'squad_rules')
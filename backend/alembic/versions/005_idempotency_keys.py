@@ -0,0 +1,29 @@
+"""add idempotency keys table
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-01-05 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('key', sa.String(), primary_key=True),
+        sa.Column('request_hash', sa.String(), nullable=False),
+        sa.Column('response', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+    )
+
+
+def downgrade():
+    op.drop_table('idempotency_keys')
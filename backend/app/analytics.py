@@ -0,0 +1,147 @@
+import asyncio
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Auction, Player, Team
+from app.project_cache import ProjectCache
+
+def _records(df) -> list:
+    """DataFrame rows as JSON-safe dicts (NaN -> None)."""
+    import pandas as pd
+
+    return df.astype(object).where(pd.notna(df), None).to_dict("records")
+
+class ProjectAnalytics:
+    """Column arrays for one project's sale history, with memoised reports.
+
+    Built once per project version: any sale or undo invalidates it.
+    """
+
+    def __init__(self, sales, category_totals):
+        self.sales = sales
+        self.category_totals = category_totals
+        self._reports: Dict[str, object] = {}
+
+    async def report(self, name: str, compute: Callable[["ProjectAnalytics"], object]):
+        # CPU-bound pandas work runs in a worker thread, off the event loop
+        if name not in self._reports:
+            self._reports[name] = await asyncio.to_thread(compute, self)
+        return self._reports[name]
+
+def premiums(data: ProjectAnalytics) -> list:
+    """Price versus base price by role and category."""
+    sales = data.sales
+    if sales.empty:
+        return []
+    grouped = sales.groupby(["role", "category"], dropna=False)
+    result = grouped.agg(
+        sold=("price", "size"),
+        avg_price=("price", "mean"),
+        median_price=("price", "median"),
+        max_price=("price", "max"),
+        avg_base_price=("base_price", "mean"),
+        avg_premium=("premium", "mean"),
+        avg_premium_ratio=("premium_ratio", "mean"),
+    ).reset_index()
+    return _records(result.sort_values("avg_premium", ascending=False))
+
+def spend_curves(data: ProjectAnalytics) -> list:
+    """Cumulative spend over time for each team."""
+    sales = data.sales
+    if sales.empty:
+        return []
+    ordered = sales.sort_values("timestamp")
+    ordered = ordered.assign(
+        cumulative_spend=ordered.groupby("team_id")["price"].cumsum(),
+        timestamp=ordered["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S.%f"),
+    )
+    curves = []
+    for (team_id, team_name), points in ordered.groupby(["team_id", "team_name"], sort=False):
+        curves.append({
+            "team_id": int(team_id),
+            "team_name": team_name,
+            "points": _records(points[["timestamp", "price", "cumulative_spend", "player_name"]]),
+        })
+    return curves
+
+def contested_categories(data: ProjectAnalytics) -> list:
+    """Categories ranked by sell-through weighted bidding premium."""
+    import numpy as np
+
+    totals = data.category_totals
+    if totals.empty:
+        return []
+    sales = data.sales
+    by_category = sales.groupby("category", dropna=False).agg(
+        sold=("price", "size"),
+        total_spend=("price", "sum"),
+        avg_premium_ratio=("premium_ratio", "mean"),
+    )
+    result = totals.join(by_category, on="category", how="left")
+    result["sold"] = result["sold"].fillna(0).astype(int)
+    result["total_spend"] = result["total_spend"].fillna(0.0)
+    result["sell_through"] = result["sold"] / result["players"]
+    result["contest_score"] = np.where(
+        result["avg_premium_ratio"].notna(),
+        result["sell_through"] * result["avg_premium_ratio"],
+        0.0,
+    )
+    return _records(result.sort_values("contest_score", ascending=False))
+
+def build_analytics(sales_rows, totals_rows) -> ProjectAnalytics:
+    """Column arrays from the raw rows (CPU-bound; runs in a worker thread)."""
+    # Heavy imports stay off the startup path
+    import numpy as np
+    import pandas as pd
+
+    sales = pd.DataFrame(
+        sales_rows,
+        columns=["timestamp", "price", "team_id", "team_name",
+                 "player_name", "base_price", "role", "category"]
+    )
+    sales["timestamp"] = pd.to_datetime(sales["timestamp"])
+    sales["role"] = sales["role"].map(lambda role: getattr(role, "value", role))
+    sales["price"] = sales["price"].astype(float)
+    sales["base_price"] = sales["base_price"].fillna(0.0).astype(float)
+    sales["premium"] = sales["price"] - sales["base_price"]
+    base = sales["base_price"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sales["premium_ratio"] = np.where(base > 0, sales["price"].to_numpy() / base, np.nan)
+
+    category_totals = pd.DataFrame(totals_rows, columns=["category", "players"])
+    return ProjectAnalytics(sales, category_totals)
+
+class AnalyticsCache(ProjectCache[ProjectAnalytics]):
+    """Per-project analytics frames, dropped on every sale or undo.
+
+    Reporting only, so misses load from the replica when one is in use.
+    Frames are large: at most ANALYTICS_CACHE_SIZE projects are kept.
+    """
+
+    primary_only = False
+    max_items = settings.ANALYTICS_CACHE_SIZE
+
+    async def load(self, db: AsyncSession, project_id: int) -> Optional[ProjectAnalytics]:
+        sales_result = await db.execute(
+            select(
+                Auction.timestamp, Auction.price, Auction.team_id, Team.name,
+                Player.name, Player.base_price, Player.role, Player.category
+            )
+            .join(Player, Player.id == Auction.player_id)
+            .join(Team, Team.id == Auction.team_id)
+            .where(
+                and_(Auction.project_id == project_id,
+                     Auction.is_reverted == False)
+            )
+        )
+        totals_result = await db.execute(
+            select(Player.category, func.count(Player.id))
+            .where(Player.project_id == project_id)
+            .group_by(Player.category)
+        )
+        return await asyncio.to_thread(build_analytics, sales_result.all(), totals_result.all())
+
+analytics_cache = AnalyticsCache()
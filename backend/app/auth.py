@@ -2,14 +2,14 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.config import settings
-from app.database import get_db
-from app.models import User
+from app.database import get_db, get_read_db, async_session, token_payload
+from app.models import User, UserRole
 
 # Use a simpler hasher that doesn't have 72-byte limit
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
@@ -35,28 +35,90 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
-    credentials_exception = HTTPException(
+def create_view_token(project_id: int, expires_delta: Optional[timedelta] = None):
+    """Signed, project-scoped token for read-only spectators"""
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.VIEW_TOKEN_EXPIRE_MINUTES))
+    return jwt.encode(
+        {"pid": project_id, "scope": "view", "exp": expire},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+
+def verify_view_token(token: str, project_id: int) -> bool:
+    """Check a view token without touching the database"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return False
+    return payload.get("scope") == "view" and payload.get("pid") == project_id
+
+def token_role(token: str) -> Optional[str]:
+    """Role claim of an access token, read without a database lookup"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("role")
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _user_id(payload: Optional[dict]) -> int:
+    user_id = payload.get("sub") if payload else None
+    if user_id is None:
+        raise _credentials_exception()
+    return int(user_id)
+
+async def _load_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalar_one_or_none()
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
     
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
+    user = await _load_user(db, _user_id(payload))
     
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_current_admin_user(current_user: User = Depends(get_current_active_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+async def get_current_read_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """``get_current_active_user`` for read-only endpoints.
+
+    The user is loaded through the endpoint's own read session, so these
+    requests never hold a primary connection; the token is decoded once,
+    together with read routing.
+    """
+    user_id = _user_id(token_payload(request))
+    user = await _load_user(db, user_id)
+    if user is None:
+        # Just signed up and not on the replica yet
+        async with async_session() as primary:
+            user = await _load_user(primary, user_id)
+    
+    if user is None:
+        raise _credentials_exception()
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
@@ -0,0 +1,144 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Player, PlayerStatus, Project
+from app.project_cache import ProjectCache
+
+class BasePriceTree:
+    """Fenwick trees over a project's players sorted by base price.
+
+    Every player has a fixed slot; only unsold players are active. That
+    gives O(log n) sale/undo updates and O(log n) "sum of the k cheapest
+    unsold base prices" queries.
+    """
+
+    def __init__(self, players: List[Tuple[int, float, bool]]):
+        ordered = sorted(players, key=lambda p: (p[1], p[0]))
+        self.size = len(ordered)
+        self.slots: Dict[int, int] = {}
+        self.prices: List[float] = [0.0] * (self.size + 1)
+        self.active: List[bool] = [False] * (self.size + 1)
+        self._counts = [0] * (self.size + 1)
+        self._sums = [0.0] * (self.size + 1)
+        self.unsold = 0
+
+        for slot, (player_id, price, unsold) in enumerate(ordered, start=1):
+            self.slots[player_id] = slot
+            self.prices[slot] = price
+            if unsold:
+                self._update(slot, 1, price)
+
+        self._step = 1
+        while self._step * 2 <= self.size:
+            self._step *= 2
+
+    def _update(self, slot: int, count: int, price: float):
+        self.active[slot] = count > 0
+        self.unsold += count
+        amount = count * price
+        while slot <= self.size:
+            self._counts[slot] += count
+            self._sums[slot] += amount
+            slot += slot & -slot
+
+    def set_unsold(self, player_id: int, unsold: bool) -> bool:
+        slot = self.slots.get(player_id)
+        if slot is None or self.active[slot] == unsold:
+            return False
+        self._update(slot, 1 if unsold else -1, self.prices[slot])
+        return True
+
+    def cheapest_sum(self, k: int) -> float:
+        """Sum of the k cheapest unsold base prices (all of them if fewer)."""
+        if k >= self.unsold:
+            k = self.unsold
+        if k <= 0:
+            return 0.0
+        position, remaining, total = 0, k, 0.0
+        step = self._step
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self._counts[nxt] < remaining:
+                position = nxt
+                remaining -= self._counts[nxt]
+                total += self._sums[nxt]
+            step //= 2
+        # position + 1 is the slot of the k-th cheapest unsold player
+        return total + remaining * self.prices[position + 1]
+
+class BudgetEngine:
+    """Max-bid and feasibility answers for one project.
+
+    A team may bid up to its remaining budget minus what it needs to fill
+    its other open squad slots with the cheapest unsold players.
+    """
+
+    def __init__(self, project_id: int, squad_size: Optional[int], enforce: bool, players):
+        self.project_id = project_id
+        self.squad_size = squad_size
+        self.enforce = enforce
+        self.tree = BasePriceTree(players)
+
+    def slots_left(self, players_count: int) -> Optional[int]:
+        if not self.squad_size:
+            return None
+        return max(self.squad_size - players_count, 0)
+
+    def reserve(self, players_count: int, player_id: Optional[int] = None) -> float:
+        """Money a team must keep back after buying one more player."""
+        slots = self.slots_left(players_count)
+        if slots is None:
+            return 0.0
+        # The lot on the block cannot also be one of the cheap fillers
+        excluded = player_id is not None and self.tree.set_unsold(player_id, False)
+        try:
+            return self.tree.cheapest_sum(slots - 1)
+        finally:
+            if excluded:
+                self.tree.set_unsold(player_id, True)
+
+    def max_bid(self, remaining_budget: float, players_count: int, player_id: Optional[int] = None) -> float:
+        if self.slots_left(players_count) == 0:
+            return 0.0
+        return max(remaining_budget - self.reserve(players_count, player_id), 0.0)
+
+class BudgetRegistry(ProjectCache[BudgetEngine]):
+    """Per-project budget engines, kept in sync by the sell/undo/upload paths."""
+
+    async def load(self, db: AsyncSession, project_id: int) -> Optional[BudgetEngine]:
+        project_result = await db.execute(
+            select(Project.squad_size, Project.enforce_budget_feasibility)
+            .where(Project.id == project_id)
+        )
+        project = project_result.one_or_none()
+        if project is None:
+            return None
+
+        players_result = await db.execute(
+            select(Player.id, Player.base_price, Player.status)
+            .where(Player.project_id == project_id)
+        )
+        players = [
+            (row.id, row.base_price or 0.0, row.status == PlayerStatus.UNSOLD)
+            for row in players_result.all()
+        ]
+        return BudgetEngine(
+            project_id,
+            project.squad_size,
+            bool(project.enforce_budget_feasibility),
+            players
+        )
+
+    def mark_sold(self, project_id: int, player_id: int):
+        engine = self.touch(project_id)
+        if engine is not None:
+            engine.tree.set_unsold(player_id, False)
+
+    def mark_unsold(self, project_id: int, player_id: int):
+        engine = self.touch(project_id)
+        if engine is not None:
+            engine.tree.set_unsold(player_id, True)
+
+budget_engines = BudgetRegistry()
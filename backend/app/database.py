@@ -1,5 +1,10 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from fastapi import Request
+from jose import JWTError, jwt
+from typing import Dict, Optional
+import time
+
 from app.config import settings
 
 engine = create_async_engine(
@@ -9,13 +14,93 @@ engine = create_async_engine(
 )
 
 async_session = async_sessionmaker(
-    engine, 
-    class_=AsyncSession, 
+    engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+# Read-only traffic goes to the replica when one is configured
+if settings.DATABASE_READ_URL:
+    read_engine = create_async_engine(
+        settings.DATABASE_READ_URL,
+        echo=True,
+        future=True
+    )
+else:
+    read_engine = engine
+
+async_read_session = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
     expire_on_commit=False
 )
 
 Base = declarative_base()
 
+# project_id / user_id -> monotonic time until which reads must hit the primary
+_recent_writes: Dict[int, float] = {}
+_recent_user_writes: Dict[int, float] = {}
+
+def _pin(pins: Dict[int, float], key: int):
+    now = time.monotonic()
+    pins[key] = now + settings.READ_YOUR_WRITES_SECONDS
+    # Drop expired pins so the map stays bounded by active keys
+    for stale in [k for k, until in pins.items() if until <= now]:
+        del pins[stale]
+
+def _pinned(pins: Dict[int, float], key: Optional[int]) -> bool:
+    if key is None:
+        return False
+    until = pins.get(key)
+    return until is not None and until > time.monotonic()
+
+def is_replica(session: AsyncSession) -> bool:
+    """Whether ``session`` reads from the replica rather than the primary."""
+    return read_engine is not engine and session.bind is read_engine
+
+def mark_project_written(project_id: int):
+    """Pin reads for a project to the primary until the replica catches up."""
+    if read_engine is not engine:
+        _pin(_recent_writes, project_id)
+
+def mark_user_written(user_id: int):
+    """Pin a user's project-list reads (which have no project_id to key on)
+    to the primary after they create, clone or remove a project."""
+    if read_engine is not engine:
+        _pin(_recent_user_writes, user_id)
+
+def token_payload(request: Request) -> Optional[dict]:
+    """Claims of the request's bearer token, decoded once per request and
+    shared by read routing and user lookup. None if missing or invalid."""
+    if hasattr(request.state, "token_payload"):
+        return request.state.token_payload
+    payload = None
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            pass
+    request.state.token_payload = payload
+    return payload
+
+def _request_user_id(request: Request) -> Optional[int]:
+    payload = token_payload(request)
+    try:
+        return int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def _needs_primary(request: Request) -> bool:
+    if read_engine is engine:
+        return True
+    if request.headers.get("X-Read-Primary"):
+        return True
+    project_id = request.path_params.get("project_id")
+    if project_id is not None and _pinned(_recent_writes, int(project_id)):
+        return True
+    return bool(_recent_user_writes) and _pinned(_recent_user_writes, _request_user_id(request))
+
 async def get_db():
     async with async_session() as session:
         try:
@@ -25,4 +110,21 @@ async def get_db():
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+async def get_read_db(request: Request):
+    """Session for read-only endpoints, routed to the replica when safe.
+
+    Requests send ``X-Read-Primary`` to force a primary read; projects
+    written within READ_YOUR_WRITES_SECONDS are read from the primary too.
+    """
+    if _needs_primary(request):
+        session_factory = async_session
+    else:
+        session_factory = async_read_session
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+            await session.close()
@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import IdempotencyRecord
+
+def fingerprint(payload: str) -> str:
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class IdempotencyStore:
+    """Replays responses for retried requests carrying an Idempotency-Key.
+
+    Completed responses live in a bounded LRU (optionally mirrored to the
+    ``idempotency_keys`` table, written in the request's own transaction).
+    Both honour IDEMPOTENCY_TTL_SECONDS; expired table rows are pruned
+    opportunistically, at most once per PRUNE_INTERVAL_SECONDS, on insert.
+    Identical requests that arrive while the first is still running wait
+    for it instead of executing again. Failed requests are not recorded,
+    so a retry after an error runs normally.
+    """
+
+    PRUNE_INTERVAL_SECONDS = 60
+
+    def __init__(self, max_entries: int, ttl_seconds: float, persist: bool):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self._entries: "OrderedDict[str, Tuple[float, str, dict]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._last_prune = 0.0
+
+    def _get(self, key: str) -> Optional[Tuple[str, dict]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, request_hash, response = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return request_hash, response
+
+    def _put(self, key: str, request_hash: str, response: dict):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, request_hash, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+
+    async def _prune(self, db: AsyncSession):
+        now = time.monotonic()
+        if now - self._last_prune < self.PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_prune = now
+        await db.execute(
+            delete(IdempotencyRecord)
+            .where(IdempotencyRecord.created_at < self._cutoff())
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _replay(request_hash: str, cached: Tuple[str, dict]) -> dict:
+        if cached[0] != request_hash:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request"
+            )
+        return cached[1]
+
+    async def run(
+        self,
+        db: AsyncSession,
+        key: str,
+        request_hash: str,
+        execute: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        cached = self._get(key)
+        if cached is not None:
+            return self._replay(request_hash, cached)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            cached = await asyncio.shield(inflight)
+            return self._replay(request_hash, cached)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if self.persist:
+                record_result = await db.execute(
+                    select(IdempotencyRecord).where(IdempotencyRecord.key == key)
+                )
+                record = record_result.scalar_one_or_none()
+                if record is not None and record.created_at < self._cutoff():
+                    # Expired: free the key so this request can claim it
+                    await db.delete(record)
+                    await db.flush()
+                    record = None
+                if record is not None:
+                    cached = (record.request_hash, record.response)
+                    self._put(key, *cached)
+                    future.set_result(cached)
+                    return self._replay(request_hash, cached)
+
+            response = await execute()
+            if self.persist:
+                await self._prune(db)
+                db.add(IdempotencyRecord(key=key, request_hash=request_hash, response=response))
+            self._put(key, request_hash, response)
+            future.set_result((request_hash, response))
+            return response
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+                # Mark retrieved so an error nobody waited on is not logged
+                future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(key, None)
+
+idempotency = IdempotencyStore(
+    max_entries=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    persist=settings.IDEMPOTENCY_PERSIST
+)
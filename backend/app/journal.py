@@ -0,0 +1,345 @@
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session, mark_project_written
+from app.models import Player, Team, Auction, PlayerStatus
+from app.analytics import analytics_cache
+from app.records import PlayerRecord, TeamRecord
+
+logger = logging.getLogger(__name__)
+
+class ProjectLedger:
+    """Authoritative team budgets and player status for one project while
+    sales are journaled ahead of the database."""
+
+    def __init__(self, project_id: int):
+        self.project_id = project_id
+        self.players: Dict[int, PlayerRecord] = {}
+        self.teams: Dict[int, TeamRecord] = {}
+        self.lock = asyncio.Lock()
+
+    def apply_sale(self, entry: dict) -> bool:
+        player = self.players.get(entry["player_id"])
+        team = self.teams.get(entry["team_id"])
+        if player is None or team is None or player.sold:
+            return False
+        player.sold = True
+        team.remaining_budget -= entry["price"]
+        team.players_count += 1
+        return True
+
+    def revert_sale(self, player_id: int, team_id: int, price: float):
+        player = self.players.get(player_id)
+        team = self.teams.get(team_id)
+        if player is None or team is None or not player.sold:
+            return
+        player.sold = False
+        team.remaining_budget += price
+        team.players_count -= 1
+
+class SaleJournal:
+    """Write-behind journal for sales.
+
+    A sale is validated against the in-memory ledger, appended to a local
+    file and acknowledged once that file is fsynced; appends arriving
+    within SALE_JOURNAL_FSYNC_INTERVAL_MS share one fsync. A background
+    flusher then applies journaled sales to the database in batches and
+    records the last applied sequence number in a checkpoint file.
+    Entries past the checkpoint are replayed on startup. Replays are
+    idempotent: a sale is only applied to a player that is still unsold.
+    """
+
+    def __init__(self, path: str, fsync_interval: float, flush_interval: float, flush_batch_size: int):
+        self.path = path
+        self.checkpoint_path = path + ".checkpoint"
+        self.fsync_interval = fsync_interval
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+
+        self.ledgers: Dict[int, ProjectLedger] = {}
+        self.player_projects: Dict[int, int] = {}
+        self._load_lock = asyncio.Lock()
+
+        self._seq = 0
+        self._file = None
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._unflushed: Deque[dict] = deque()
+        self._io_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wake_writer = asyncio.Event()
+        self._wake_flusher = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.running = False
+
+    # --- lifecycle -------------------------------------------------------
+
+    async def start(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        await self._recover()
+        self._file = open(self.path, "ab")
+        self.running = True
+        self._tasks = [
+            asyncio.create_task(self._writer_loop()),
+            asyncio.create_task(self._flusher_loop()),
+        ]
+
+    async def close(self):
+        """Make every accepted sale durable and flushed, then stop."""
+        if not self.running:
+            return
+        self.running = False
+        self._wake_writer.set()
+        self._wake_flusher.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._write_pending()
+        await self.flush_all()
+        self._file.close()
+        self._file = None
+
+    async def _recover(self):
+        checkpoint = self._read_checkpoint()
+        entries = []
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn write from a crash mid-append; nothing after it was acked
+                        break
+                    if entry["seq"] > checkpoint:
+                        entries.append(entry)
+
+        self._seq = max([checkpoint] + [entry["seq"] for entry in entries])
+        if entries:
+            logger.info("replaying %d journaled sales after seq %d", len(entries), checkpoint)
+            for start in range(0, len(entries), self.flush_batch_size):
+                await self._apply(entries[start:start + self.flush_batch_size])
+        self._write_checkpoint(self._seq)
+        with open(self.path, "wb"):
+            pass
+
+    def _read_checkpoint(self) -> int:
+        try:
+            with open(self.checkpoint_path) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _write_checkpoint(self, seq: int):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(seq))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # --- ledger ----------------------------------------------------------
+
+    async def ledger_for_player(self, db: AsyncSession, player_id: int) -> Optional[ProjectLedger]:
+        project_id = self.player_projects.get(player_id)
+        if project_id is None:
+            result = await db.execute(select(Player.project_id).where(Player.id == player_id))
+            project_id = result.scalar_one_or_none()
+            if project_id is None:
+                return None
+        return await self.ledger(db, project_id)
+
+    async def ledger(self, db: AsyncSession, project_id: int) -> ProjectLedger:
+        ledger = self.ledgers.get(project_id)
+        if ledger is not None:
+            return ledger
+
+        async with self._load_lock:
+            ledger = self.ledgers.get(project_id)
+            if ledger is not None:
+                return ledger
+
+            ledger = ProjectLedger(project_id)
+            players_result = await db.execute(
+                select(
+                    Player.id, Player.project_id, Player.name, Player.base_price,
+                    Player.category, Player.role, Player.points, Player.status
+                )
+                .where(Player.project_id == project_id)
+            )
+            for row in players_result.all():
+                ledger.players[row.id] = PlayerRecord.from_row(row)
+                self.player_projects[row.id] = project_id
+
+            teams_result = await db.execute(
+                select(Team.id, Team.name, Team.remaining_budget, Team.players_count)
+                .where(Team.project_id == project_id)
+            )
+            for row in teams_result.all():
+                ledger.teams[row.id] = TeamRecord.from_row(row)
+
+            # Sales acknowledged but not yet in the database
+            for entry in list(self._unflushed) + [entry for entry, _ in self._pending]:
+                if entry["project_id"] == project_id:
+                    ledger.apply_sale(entry)
+
+            self.ledgers[project_id] = ledger
+            return ledger
+
+    def invalidate(self, project_id: int):
+        """Drop a ledger after teams or players change outside the journal."""
+        ledger = self.ledgers.pop(project_id, None)
+        if ledger is not None:
+            for player_id in ledger.players:
+                self.player_projects.pop(player_id, None)
+
+    def record_undo(self, project_id: int, player_id: int, team_id: int, price: float):
+        ledger = self.ledgers.get(project_id)
+        if ledger is not None:
+            ledger.revert_sale(player_id, team_id, price)
+
+    def has_unflushed(self, project_id: int) -> bool:
+        return any(entry["project_id"] == project_id for entry in self._unflushed)
+
+    # --- append / fsync --------------------------------------------------
+
+    async def append(self, entry: dict) -> dict:
+        """Assign a sequence number and wait until the entry is on disk."""
+        if not self.running:
+            raise RuntimeError("Sale journal is not running")
+        self._seq += 1
+        entry["seq"] = self._seq
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((entry, future))
+        self._wake_writer.set()
+        await future
+        return entry
+
+    async def _writer_loop(self):
+        while self.running:
+            await self._wake_writer.wait()
+            self._wake_writer.clear()
+            # Give concurrent sales a moment to join this fsync
+            await asyncio.sleep(self.fsync_interval)
+            await self._write_pending()
+
+    async def _write_pending(self):
+        async with self._io_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            data = b"".join(
+                json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n"
+                for entry, _ in batch
+            )
+            try:
+                await asyncio.to_thread(self._write_sync, data)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            for entry, future in batch:
+                self._unflushed.append(entry)
+                if not future.done():
+                    future.set_result(entry)
+        if len(self._unflushed) >= self.flush_batch_size:
+            self._wake_flusher.set()
+
+    def _write_sync(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    # --- database flush --------------------------------------------------
+
+    async def _flusher_loop(self):
+        while self.running:
+            try:
+                await asyncio.wait_for(self._wake_flusher.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake_flusher.clear()
+            try:
+                await self.flush_all()
+            except Exception:
+                logger.exception("sale journal flush failed; will retry")
+
+    async def flush_all(self):
+        """Apply every durable journal entry to the database."""
+        async with self._flush_lock:
+            while self._unflushed:
+                batch = list(self._unflushed)[:self.flush_batch_size]
+                await self._apply(batch)
+                # Entries stay visible to ledger reloads until committed
+                for _ in batch:
+                    self._unflushed.popleft()
+                await asyncio.to_thread(self._write_checkpoint, batch[-1]["seq"])
+
+            async with self._io_lock:
+                if not self._pending and not self._unflushed and self._file is not None:
+                    await asyncio.to_thread(self._file.truncate, 0)
+
+    async def flush_project(self, project_id: int):
+        """``flush_all``, after any sale of this project that is still being
+        fsynced: those hold the ledger lock until they are durable."""
+        ledger = self.ledgers.get(project_id)
+        if ledger is not None:
+            async with ledger.lock:
+                pass
+        await self.flush_all()
+
+    async def _apply(self, entries: List[dict]):
+        projects = set()
+        async with async_session() as db:
+            for entry in entries:
+                sold_at = datetime.fromisoformat(entry["sold_at"])
+                result = await db.execute(
+                    update(Player)
+                    .where(Player.id == entry["player_id"], Player.status == PlayerStatus.UNSOLD)
+                    .values(
+                        status=PlayerStatus.SOLD,
+                        current_team_id=entry["team_id"],
+                        sold_price=entry["price"],
+                        sold_at=sold_at
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount != 1:
+                    logger.warning("skipping journaled sale %s: player already sold", entry["seq"])
+                    continue
+                await db.execute(
+                    update(Team)
+                    .where(Team.id == entry["team_id"])
+                    .values(
+                        remaining_budget=Team.remaining_budget - entry["price"],
+                        players_count=Team.players_count + 1
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.add(Auction(
+                    project_id=entry["project_id"],
+                    player_id=entry["player_id"],
+                    team_id=entry["team_id"],
+                    price=entry["price"],
+                    timestamp=sold_at
+                ))
+                projects.add(entry["project_id"])
+            await db.commit()
+        for project_id in projects:
+            mark_project_written(project_id)
+            analytics_cache.invalidate(project_id)
+
+sale_journal = SaleJournal(
+    path=settings.SALE_JOURNAL_PATH,
+    fsync_interval=settings.SALE_JOURNAL_FSYNC_INTERVAL_MS / 1000,
+    flush_interval=settings.SALE_JOURNAL_FLUSH_INTERVAL_MS / 1000,
+    flush_batch_size=settings.SALE_JOURNAL_FLUSH_BATCH_SIZE
+)
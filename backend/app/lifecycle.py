@@ -0,0 +1,300 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from fastapi import HTTPException
+from sqlalchemy import select, delete, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.database import async_session, mark_project_written, mark_user_written
+from app.models import Project, Team, Player, Auction, AuditLog, ProjectArchive, PlayerStatus
+from app.player_pool import player_pool
+from app.budget import budget_engines
+from app.squad_rules import squad_rules
+from app.journal import sale_journal
+from app.analytics import analytics_cache
+
+logger = logging.getLogger(__name__)
+
+DELETE_CHUNK_SIZE = 1000
+
+# Child tables in foreign-key safe order, each keyed on project_id
+HOT_TABLES = [
+    ("audit_logs", AuditLog),
+    ("auctions", Auction),
+    ("players", Player),
+    ("teams", Team),
+]
+
+# A deleted project also loses its archive, if it had one
+DELETE_TABLES = HOT_TABLES + [("project_archives", ProjectArchive)]
+
+# Projects in these states no longer accept sales, uploads or new teams
+READ_ONLY_STATUSES = ("deleting", "archiving", "archived")
+
+async def ensure_project_writable(db: AsyncSession, project_id: int):
+    """Reject writes to a project that is being (or has been) cleared.
+
+    The status row is read FOR SHARE and held until the caller commits, so
+    starting a lifecycle job (which updates the status) waits for in-flight
+    writes, and writes that come after it see the new status.
+    """
+    result = await db.execute(
+        select(Project.status).where(Project.id == project_id).with_for_update(read=True)
+    )
+    status = result.scalar_one_or_none()
+    if status in READ_ONLY_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Project is {status}")
+
+class LifecycleJob:
+    def __init__(self, project_id: int, kind: str, owner_id: Optional[int]):
+        self.project_id = project_id
+        self.kind = kind
+        self.owner_id = owner_id
+        self.status = "pending"
+        self.progress: Dict[str, Dict[str, int]] = {}
+        self.error: Optional[str] = None
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    def to_dict(self):
+        return {
+            "project_id": self.project_id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+def build_snapshot(project: Project, teams, sales, unsold_count: int) -> dict:
+    """Compact record of a finished project: teams, final squads and sales."""
+    squads: Dict[int, list] = {team.id: [] for team in teams}
+    history = []
+    for sale in sales:
+        player = sale.player
+        entry = {
+            "player_id": player.id,
+            "name": player.name,
+            "category": player.category,
+            "role": player.role.value if player.role else None,
+            "points": player.points,
+            "base_price": player.base_price,
+            "price": sale.price,
+            "team_id": sale.team_id,
+            "timestamp": sale.timestamp.isoformat() if sale.timestamp else None,
+        }
+        history.append(entry)
+        squads.setdefault(sale.team_id, []).append(entry)
+
+    return {
+        "project": {
+            "id": project.id,
+            "name": project.name,
+            "total_teams": project.total_teams,
+            "own_team_id": project.own_team_id,
+            "squad_size": project.squad_size,
+            "squad_rules": project.squad_rules,
+            "created_at": project.created_at.isoformat() if project.created_at else None,
+        },
+        "teams": [
+            {
+                "id": team.id,
+                "name": team.name,
+                "color": team.color,
+                "initial_budget": team.initial_budget,
+                "remaining_budget": team.remaining_budget,
+                "players_count": team.players_count,
+                "squad": squads.get(team.id, []),
+            }
+            for team in teams
+        ],
+        "sales": history,
+        "unsold_players": unsold_count,
+    }
+
+def snapshot_totals(snapshot: dict) -> dict:
+    """Dashboard totals for an archived project, whose hot rows are gone."""
+    sales = snapshot.get("sales", [])
+    timestamps = [sale["timestamp"] for sale in sales if sale.get("timestamp")]
+    return {
+        "team_count": len(snapshot.get("teams", [])),
+        "sold_count": len(sales),
+        "unsold_count": snapshot.get("unsold_players", 0),
+        "total_spend": sum(sale["price"] or 0 for sale in sales),
+        "last_sale_at": max(timestamps) if timestamps else None,
+    }
+
+class ProjectLifecycle:
+    """Runs project deletion and archival as chunked background jobs.
+
+    Each chunk is its own short transaction, so a large project never holds
+    row locks for longer than one batch. Jobs interrupted by a restart are
+    picked up again by ``resume`` from the project's status.
+
+    ``statuses`` mirrors the status of read-only projects (loaded by
+    ``resume``, updated by jobs) for paths that must not query the
+    database, i.e. journaled sales, which are single-process anyway.
+    """
+
+    MAX_JOBS = 1000
+
+    def __init__(self):
+        self.jobs: "OrderedDict[int, LifecycleJob]" = OrderedDict()
+        self.tasks: Set[asyncio.Task] = set()
+        self.statuses: Dict[int, str] = {}
+
+    def ensure_writable(self, project_id: int):
+        """``ensure_project_writable`` from memory, without a round trip."""
+        status = self.statuses.get(project_id)
+        if status in READ_ONLY_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Project is {status}")
+
+    def get(self, project_id: int) -> Optional[LifecycleJob]:
+        return self.jobs.get(project_id)
+
+    def in_progress(self, project_id: int) -> bool:
+        job = self.jobs.get(project_id)
+        return job is not None and job.status in ("pending", "running")
+
+    def start(self, project_id: int, kind: str, owner_id: Optional[int] = None) -> LifecycleJob:
+        job = self.jobs.get(project_id)
+        if job is not None and job.status in ("pending", "running"):
+            return job
+
+        job = LifecycleJob(project_id, kind, owner_id)
+        self.statuses[project_id] = "deleting" if kind == "delete" else "archiving"
+        self.jobs[project_id] = job
+        self.jobs.move_to_end(project_id)
+        while len(self.jobs) > self.MAX_JOBS:
+            self.jobs.popitem(last=False)
+
+        task = asyncio.create_task(self._run(job))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return job
+
+    async def resume(self):
+        async with async_session() as db:
+            result = await db.execute(
+                select(Project.id, Project.status, Project.owner_id)
+                .where(Project.status.in_(READ_ONLY_STATUSES))
+            )
+            read_only = result.all()
+        for project_id, status, owner_id in read_only:
+            self.statuses[project_id] = status
+            if status != "archived":
+                self.start(project_id, "delete" if status == "deleting" else "archive", owner_id)
+
+    async def drain(self):
+        """Wait for running jobs, e.g. before the process exits."""
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def _run(self, job: LifecycleJob):
+        job.status = "running"
+        try:
+            if sale_journal.running:
+                await sale_journal.flush_project(job.project_id)
+            if job.kind == "archive":
+                await self._snapshot(job.project_id)
+                await self._clear_tables(job, HOT_TABLES)
+            else:
+                await self._clear_tables(job, DELETE_TABLES)
+            async with async_session() as db:
+                if job.kind == "archive":
+                    await db.execute(
+                        update(Project)
+                        .where(Project.id == job.project_id)
+                        .values(status="archived")
+                    )
+                else:
+                    await db.execute(delete(Project).where(Project.id == job.project_id))
+                await db.commit()
+            if job.kind == "archive":
+                self.statuses[job.project_id] = "archived"
+            else:
+                self.statuses.pop(job.project_id, None)
+            job.status = "done"
+        except Exception as e:
+            logger.exception("project %s %s failed", job.project_id, job.kind)
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            mark_project_written(job.project_id)
+            if job.owner_id is not None:
+                mark_user_written(job.owner_id)
+            # The project's rows are gone (or going): drop its cached state
+            for cache in (player_pool, budget_engines, squad_rules, analytics_cache):
+                cache.evict(job.project_id)
+            sale_journal.invalidate(job.project_id)
+
+    async def _snapshot(self, project_id: int):
+        async with async_session() as db:
+            existing = await db.execute(
+                select(ProjectArchive.id).where(ProjectArchive.project_id == project_id)
+            )
+            if existing.scalar_one_or_none() is not None:
+                return
+
+            project = (await db.execute(
+                select(Project).where(Project.id == project_id)
+            )).scalar_one()
+            teams = (await db.execute(
+                select(Team).where(Team.project_id == project_id).order_by(Team.id)
+            )).scalars().all()
+            sales = (await db.execute(
+                select(Auction)
+                .options(selectinload(Auction.player))
+                .where(Auction.project_id == project_id, Auction.is_reverted == False)
+                .order_by(Auction.timestamp)
+            )).scalars().all()
+            unsold_count = (await db.execute(
+                select(func.count(Player.id))
+                .where(Player.project_id == project_id, Player.status == PlayerStatus.UNSOLD)
+            )).scalar_one()
+
+            db.add(ProjectArchive(
+                project_id=project_id,
+                snapshot=build_snapshot(project, teams, sales, unsold_count)
+            ))
+            await db.commit()
+
+    async def _clear_tables(self, job: LifecycleJob, tables):
+        async with async_session() as db:
+            await db.execute(
+                update(Project).where(Project.id == job.project_id).values(own_team_id=None)
+            )
+            for table, model in tables:
+                total = (await db.execute(
+                    select(func.count(model.id)).where(model.project_id == job.project_id)
+                )).scalar_one()
+                job.progress[table] = {"deleted": 0, "total": total}
+            await db.commit()
+
+        for table, model in tables:
+            while True:
+                chunk = (
+                    select(model.id)
+                    .where(model.project_id == job.project_id)
+                    .limit(DELETE_CHUNK_SIZE)
+                )
+                async with async_session() as db:
+                    result = await db.execute(
+                        delete(model)
+                        .where(model.id.in_(chunk))
+                        .execution_options(synchronize_session=False)
+                    )
+                    await db.commit()
+                job.progress[table]["deleted"] += result.rowcount
+                if result.rowcount < DELETE_CHUNK_SIZE:
+                    break
+                # Let request handlers in between chunks
+                await asyncio.sleep(0)
+
+lifecycle = ProjectLifecycle()
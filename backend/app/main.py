@@ -1,20 +1,54 @@
+from app.startup import startup_timer, FirstRequestMiddleware, check_schema_at_head
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
 
+from app.config import settings
 from app.database import engine
 from app.models import Base
-from app.routers import auth, projects, teams, auction, upload
+from app.routers import auth, projects, teams, auction, upload, analytics, admin
+from app import profiling
+from app.lifecycle import lifecycle
+from app.journal import sale_journal
+from app.websocket import manager
+
+startup_timer.mark("imports")
+
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        if settings.SCHEMA_MODE == "migrations":
+            await check_schema_at_head(conn)
+        else:
+            await conn.run_sync(Base.metadata.create_all)
+    startup_timer.mark("schema")
+    if settings.SALE_JOURNAL_ENABLED:
+        # Replay journaled sales before resumed jobs start clearing projects
+        await sale_journal.start()
+        startup_timer.mark("journal")
+    await lifecycle.resume()
     yield
+    # Normally a no-op: the pre-stop hook (POST /admin/drain) already drained
+    await manager.drain()
+    try:
+        await asyncio.wait_for(lifecycle.drain(), timeout=settings.SHUTDOWN_DRAIN_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        # Unfinished jobs resume from the project status on next startup
+        logger.warning("lifecycle jobs still running at shutdown; they will resume on restart")
+    await sale_journal.close()
     await engine.dispose()
 
-app = FastAPI(title="Auction Management System", lifespan=lifespan)
+app = FastAPI(
+    title="Auction Management System",
+    lifespan=lifespan
+)
 
 # Allow Railway and localhost
 origins = [
@@ -30,13 +64,25 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(FirstRequestMiddleware)
+if settings.PROFILING_ENABLED:
+    profiling.install(app)
 
 app.include_router(auth.router)
 app.include_router(projects.router)
 app.include_router(teams.router)
 app.include_router(auction.router)
 app.include_router(upload.router)
+app.include_router(analytics.router)
+app.include_router(admin.router)
 
 @app.get("/")
 async def root():
-    return {"message": "Auction API is running"}
\ No newline at end of file
+    return {"message": "Auction API is running"}
+
+@app.get("/health")
+async def health():
+    # Failing health checks take a draining instance out of the load balancer
+    if manager.draining:
+        return JSONResponse(status_code=503, content={"status": "draining"})
+    return {"status": "ok", "startup": startup_timer.as_dict()}
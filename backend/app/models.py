@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean, Index
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean, Index, JSON
 from sqlalchemy.orm import relationship, declarative_base  # Added declarative_base here
 from datetime import datetime
 import enum
@@ -41,6 +41,9 @@ class Project(Base):
     total_teams = Column(Integer, default=10)
     own_team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)
     status = Column(String, default="active")
+    squad_size = Column(Integer, nullable=True)
+    enforce_budget_feasibility = Column(Boolean, default=False)
+    squad_rules = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -103,6 +106,22 @@ class Auction(Base):
     player = relationship("Player", back_populates="auction")
     team = relationship("Team", back_populates="auctions")
 
+class ProjectArchive(Base):
+    __tablename__ = "project_archives"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), unique=True)
+    snapshot = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class IdempotencyRecord(Base):
+    __tablename__ = "idempotency_keys"
+    
+    key = Column(String, primary_key=True)
+    request_hash = Column(String, nullable=False)
+    response = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
     
@@ -0,0 +1,143 @@
+import bisect
+import heapq
+import random
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Player, PlayerStatus
+from app.project_cache import ProjectCache
+from app.records import PlayerRecord
+
+# Sort key inside a (category, role) bucket: most points first, then highest
+# base price; players without points go last, id breaks ties
+LotKey = Tuple[bool, float, float, int]
+
+def _lot_key(points, base_price, player_id) -> LotKey:
+    return (points is None, -(points or 0), -(base_price or 0.0), player_id)
+
+def _bucket(player: PlayerRecord) -> Tuple[str, str, LotKey]:
+    return (
+        player.category or "",
+        player.role or "",
+        _lot_key(player.points, player.base_price, player.id)
+    )
+
+class PlayerPoolIndex:
+    """Unsold players of one project, bucketed by category tier and role.
+
+    Tiers are visited in descending category order (matching the
+    ``category desc`` ordering of the live-data query, with uncategorised
+    players last). Each role bucket is a sorted list, so the next lot is
+    found by comparing at most one head per role and inserts/removals are
+    a bisect away.
+    """
+
+    def __init__(self, project_id: int):
+        self.project_id = project_id
+        self.players: Dict[int, PlayerRecord] = {}
+        self._buckets: Dict[str, Dict[str, List[LotKey]]] = {}
+        self._tiers: List[str] = []  # ascending; iterate reversed
+
+    def __len__(self):
+        return len(self.players)
+
+    def add(self, player):
+        if player.id in self.players:
+            return
+        record = player if isinstance(player, PlayerRecord) else PlayerRecord.from_row(player)
+        tier, role, key = _bucket(record)
+
+        roles = self._buckets.get(tier)
+        if roles is None:
+            roles = self._buckets[tier] = {}
+            bisect.insort(self._tiers, tier)
+        bisect.insort(roles.setdefault(role, []), key)
+
+        self.players[record.id] = record
+
+    def remove(self, player_id: int) -> bool:
+        record = self.players.pop(player_id, None)
+        if record is None:
+            return False
+
+        tier, role, key = _bucket(record)
+        roles = self._buckets[tier]
+        bucket = roles[role]
+        del bucket[bisect.bisect_left(bucket, key)]
+        if not bucket:
+            del roles[role]
+        if not roles:
+            del self._buckets[tier]
+            del self._tiers[bisect.bisect_left(self._tiers, tier)]
+        return True
+
+    def _tier_buckets(self, category: Optional[str], role: Optional[str]):
+        """Yield the non-empty buckets of each matching tier, best tier first."""
+        tiers = reversed(self._tiers) if category is None else [category]
+        for tier in tiers:
+            roles = self._buckets.get(tier)
+            if not roles:
+                continue
+            if role is None:
+                yield list(roles.values())
+            elif roles.get(role):
+                yield [roles[role]]
+
+    def next_lot(self, category: Optional[str] = None, role: Optional[str] = None) -> Optional[PlayerRecord]:
+        for buckets in self._tier_buckets(category, role):
+            key = min(bucket[0] for bucket in buckets)
+            return self.players[key[-1]]
+        return None
+
+    def random_lot(self, category: Optional[str] = None, role: Optional[str] = None) -> Optional[PlayerRecord]:
+        """Uniform random draw from the best tier matching the filters."""
+        for buckets in self._tier_buckets(category, role):
+            pick = random.randrange(sum(len(bucket) for bucket in buckets))
+            for bucket in buckets:
+                if pick < len(bucket):
+                    return self.players[bucket[pick][-1]]
+                pick -= len(bucket)
+        return None
+
+    def queue(self, category: Optional[str] = None, role: Optional[str] = None, limit: Optional[int] = None) -> List[PlayerRecord]:
+        """Players in auction order: tier by tier, merged across roles."""
+        ordered = []
+        for buckets in self._tier_buckets(category, role):
+            for key in heapq.merge(*buckets):
+                if limit is not None and len(ordered) >= limit:
+                    return ordered
+                ordered.append(self.players[key[-1]])
+        return ordered
+
+class PlayerPoolRegistry(ProjectCache[PlayerPoolIndex]):
+    """Per-project pool indexes, kept in sync by the sell/undo/upload paths."""
+
+    async def load(self, db: AsyncSession, project_id: int) -> PlayerPoolIndex:
+        result = await db.execute(
+            select(
+                Player.id, Player.project_id, Player.name, Player.base_price,
+                Player.category, Player.role, Player.points, Player.status
+            )
+            .where(
+                and_(Player.project_id == project_id,
+                     Player.status == PlayerStatus.UNSOLD)
+            )
+        )
+        pool = PlayerPoolIndex(project_id)
+        for row in result.all():
+            pool.add(PlayerRecord.from_row(row))
+        return pool
+
+    def remove(self, project_id: int, player_id: int):
+        pool = self.touch(project_id)
+        if pool is not None:
+            pool.remove(player_id)
+
+    def add(self, project_id: int, player):
+        pool = self.touch(project_id)
+        if pool is not None:
+            pool.add(player)
+
+player_pool = PlayerPoolRegistry()
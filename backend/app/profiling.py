@@ -0,0 +1,256 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, List, Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import engine, read_engine
+from app.auth import token_role
+
+PROFILE_HEADER = b"x-profile"
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+class RequestProfile:
+    """Where one request's wall time went, in seconds."""
+
+    SECTIONS = ("sql", "orm", "encode", "broadcast")
+
+    def __init__(self, method: str, path: str, trigger: str):
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.started_at = datetime.utcnow()
+        self.status: Optional[int] = None
+        self.total = 0.0
+        self.sql = 0.0
+        self.sql_queries = 0
+        self.orm = 0.0
+        self.encode = 0.0
+        self.broadcast = 0.0
+        self.returned_at: Optional[float] = None
+
+    def to_dict(self):
+        ms = {name: round(getattr(self, name) * 1000, 3) for name in self.SECTIONS}
+        return {
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "total_ms": round(self.total * 1000, 3),
+            "sql_queries": self.sql_queries,
+            **{f"{name}_ms": value for name, value in ms.items()},
+            # Handler code, dependency resolution and request validation
+            "other_ms": round(self.total * 1000 - sum(ms.values()), 3),
+        }
+
+@contextmanager
+def section(name: str):
+    """Charge the enclosed time to ``name`` on the current request's profile."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(profile, name, getattr(profile, name) + time.perf_counter() - start)
+
+class ProfileStore:
+    """The slowest N request profiles, kept in a min-heap on total time."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._heap: list = []
+        self._counter = itertools.count()
+
+    def add(self, profile: RequestProfile):
+        item = (profile.total, next(self._counter), profile)
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, item)
+        elif item[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, item)
+
+    def slowest(self) -> List[RequestProfile]:
+        return [profile for _, _, profile in sorted(self._heap, reverse=True)]
+
+    def clear(self):
+        self._heap = []
+
+profiles = ProfileStore(settings.PROFILING_SLOWEST_N)
+
+# --- instrumentation ---------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    started = conn.info.get("profile_started")
+    if profile is None or not started:
+        return
+    profile.sql += time.perf_counter() - started.pop()
+    profile.sql_queries += 1
+
+# ORM time is session time not spent in the cursor: statement compilation,
+# row processing and flush bookkeeping. Only the outermost operation on a
+# session is charged, so an autoflush inside an execute counts once.
+
+def _orm_started(session: Session):
+    profile = _current.get()
+    if profile is not None:
+        session.info.setdefault("profile_orm", []).append((time.perf_counter(), profile.sql))
+
+def _orm_finished(session: Session):
+    profile = _current.get()
+    stack = session.info.get("profile_orm")
+    if profile is None or not stack:
+        return
+    start, sql_before = stack.pop()
+    if not stack:
+        profile.orm += time.perf_counter() - start - (profile.sql - sql_before)
+
+def _do_orm_execute(orm_execute_state):
+    if _current.get() is None:
+        return None
+    _orm_started(orm_execute_state.session)
+    try:
+        return orm_execute_state.invoke_statement()
+    finally:
+        _orm_finished(orm_execute_state.session)
+
+def _before_flush(session, flush_context, instances):
+    _orm_started(session)
+
+def _after_flush_postexec(session, flush_context):
+    _orm_finished(session)
+
+def _after_rollback(session):
+    # A failed flush never reaches after_flush_postexec
+    session.info.pop("profile_orm", None)
+
+class ProfiledRoute(APIRoute):
+    """Charges everything between the endpoint returning and the response
+    being built (response-model validation, jsonable_encoder over ORM
+    objects, JSON rendering) to the encode section."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, _stamp_return(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request: Request) -> Response:
+            response = await handler(request)
+            profile = _current.get()
+            if profile is not None and profile.returned_at is not None:
+                profile.encode += time.perf_counter() - profile.returned_at
+                profile.returned_at = None
+            return response
+
+        return profiled_handler
+
+def _stamp_return(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    def stamp():
+        profile = _current.get()
+        if profile is not None:
+            profile.returned_at = time.perf_counter()
+
+    # FastAPI reads the signature through __wrapped__; sync endpoints must
+    # stay sync so they still run in the threadpool
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            stamp()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            stamp()
+            return result
+    return wrapper
+
+# For APIRouter(route_class=...): plain routes unless profiling is on
+route_class = ProfiledRoute if settings.PROFILING_ENABLED else APIRoute
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware that profiles a sample of requests, plus any
+    request from an admin that sends an ``X-Profile`` header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _trigger(self, scope) -> Optional[str]:
+        headers = dict(scope["headers"])
+        if PROFILE_HEADER in headers:
+            authorization = headers.get(b"authorization", b"").decode("latin-1")
+            scheme, _, token = authorization.partition(" ")
+            if scheme.lower() == "bearer" and token_role(token) == "admin":
+                return "header"
+        if settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], trigger)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+            await send(message)
+
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profile.total = time.perf_counter() - start
+            _current.reset(token)
+            profiles.add(profile)
+
+def instrument_database():
+    """Hook the engines and ORM sessions; safe to call more than once."""
+    listeners = [
+        (target.sync_engine, name, fn)
+        for target in {engine, read_engine}
+        for name, fn in (
+            ("before_cursor_execute", _before_cursor_execute),
+            ("after_cursor_execute", _after_cursor_execute),
+        )
+    ]
+    listeners += [
+        (Session, "do_orm_execute", _do_orm_execute),
+        (Session, "before_flush", _before_flush),
+        (Session, "after_flush_postexec", _after_flush_postexec),
+        (Session, "after_rollback", _after_rollback),
+    ]
+    for target, name, fn in listeners:
+        if not event.contains(target, name, fn):
+            event.listen(target, name, fn)
+
+def install(app: FastAPI):
+    """Hook the database and add the middleware. Call before startup; routes
+    are timed through ``route_class``."""
+    instrument_database()
+    app.add_middleware(ProfilingMiddleware)
@@ -0,0 +1,99 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Generic, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session, is_replica
+
+T = TypeVar("T")
+
+class ProjectCache(ABC, Generic[T]):
+    """Per-project in-memory state, loaded on first use.
+
+    Subclasses implement ``load``. Mutations go through ``touch`` so a load
+    that raced with a sale or undo is served once but not cached. While the
+    sale journal is running, a project's journaled sales are flushed before
+    its state is rebuilt from the database.
+
+    Sell and undo enforce budgets and squad limits from these caches, so by
+    default a miss is loaded from the primary even when the caller holds a
+    replica session; a lagging replica must not seed enforcement state.
+
+    Loads are serialised per project, so a slow build of one project never
+    holds up another. ``max_items`` bounds the cache, least recently used
+    first.
+    """
+
+    primary_only = True
+    max_items: Optional[int] = None
+
+    def __init__(self):
+        self._items: "OrderedDict[int, T]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    @abstractmethod
+    async def load(self, db: AsyncSession, project_id: int) -> Optional[T]:
+        """Build the project's state, or return None if it does not exist."""
+
+    async def get(self, db: AsyncSession, project_id: int) -> Optional[T]:
+        item = self._items.get(project_id)
+        if item is not None:
+            if self.max_items is not None:
+                self._items.move_to_end(project_id)
+            return item
+
+        lock = self._locks.get(project_id)
+        if lock is None:
+            lock = self._locks[project_id] = asyncio.Lock()
+        async with lock:
+            item = self._items.get(project_id)
+            if item is not None:
+                return item
+
+            generation = self._generations.get(project_id, 0)
+            await self._flush_journal(project_id)
+            if self.primary_only and is_replica(db):
+                async with async_session() as primary:
+                    item = await self.load(primary, project_id)
+            else:
+                item = await self.load(db, project_id)
+            if item is not None and self._generations.get(project_id, 0) == generation:
+                self._store(project_id, item)
+            return item
+
+    def _store(self, project_id: int, item: T):
+        self._items[project_id] = item
+        if self.max_items is not None:
+            while len(self._items) > self.max_items:
+                self.evict(next(iter(self._items)))
+
+    async def _flush_journal(self, project_id: int):
+        # Imported lazily: the journal itself depends on a ProjectCache
+        from app.journal import sale_journal
+
+        if sale_journal.running and sale_journal.has_unflushed(project_id):
+            await sale_journal.flush_all()
+
+    def touch(self, project_id: int) -> Optional[T]:
+        """Record a mutation and return the cached item, if loaded."""
+        self._generations[project_id] = self._generations.get(project_id, 0) + 1
+        return self._items.get(project_id)
+
+    def invalidate(self, project_id: int):
+        self.touch(project_id)
+        self._items.pop(project_id, None)
+
+    def evict(self, project_id: int):
+        """Forget a project entirely, e.g. once it is deleted or archived."""
+        self._items.pop(project_id, None)
+        lock = self._locks.get(project_id)
+        if lock is not None and lock.locked():
+            # A load is in flight: keep its generation moving so the result
+            # is not cached
+            self.touch(project_id)
+            return
+        self._locks.pop(project_id, None)
+        self._generations.pop(project_id, None)
@@ -0,0 +1,107 @@
+from typing import Optional
+
+from app.models import PlayerStatus
+
+def _role_value(role) -> Optional[str]:
+    return getattr(role, "value", role) or None
+
+# Caches and live streams hold these instead of ORM instances: no identity
+# map, instrumentation or per-instance __dict__, and they encode to JSON
+# directly via to_dict / json_default.
+
+class PlayerRecord:
+    __slots__ = ("id", "project_id", "name", "base_price", "category", "role", "points", "sold")
+
+    def __init__(self, id: int, project_id: int, name: str, base_price: float,
+                 category: Optional[str], role: Optional[str], points: Optional[int], sold: bool):
+        self.id = id
+        self.project_id = project_id
+        self.name = name
+        self.base_price = base_price
+        self.category = category
+        self.role = role
+        self.points = points
+        self.sold = sold
+
+    @classmethod
+    def from_row(cls, row) -> "PlayerRecord":
+        return cls(
+            row.id, row.project_id, row.name, row.base_price or 0.0,
+            row.category, _role_value(row.role), row.points,
+            row.status == PlayerStatus.SOLD
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "base_price": self.base_price,
+            "category": self.category,
+            "role": self.role,
+            "points": self.points,
+        }
+
+class TeamRecord:
+    __slots__ = ("id", "name", "remaining_budget", "players_count")
+
+    def __init__(self, id: int, name: str, remaining_budget: float, players_count: int):
+        self.id = id
+        self.name = name
+        self.remaining_budget = remaining_budget
+        self.players_count = players_count
+
+    @classmethod
+    def from_row(cls, row) -> "TeamRecord":
+        return cls(row.id, row.name, row.remaining_budget, row.players_count or 0)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "remaining_budget": self.remaining_budget,
+            "players_count": self.players_count,
+        }
+
+class SaleRecord:
+    """A sale as broadcast to viewers; ``auction_id`` is None until a
+    journaled sale reaches the database."""
+
+    __slots__ = ("player", "team", "price", "auction_id", "journal_seq")
+
+    def __init__(self, player, team, price: float, auction_id: Optional[int] = None,
+                 journal_seq: Optional[int] = None):
+        self.player = player
+        self.team = team
+        self.price = price
+        self.auction_id = auction_id
+        self.journal_seq = journal_seq
+
+    def to_dict(self) -> dict:
+        player, team = self.player, self.team
+        data = {
+            "player": {
+                "id": player.id,
+                "name": player.name,
+                "sold_price": self.price,
+                "category": player.category,
+                "role": _role_value(player.role),
+                "points": player.points,
+                "team_id": team.id,
+                "team_name": team.name
+            },
+            "team": {
+                "id": team.id,
+                "remaining_budget": team.remaining_budget,
+                "players_count": team.players_count
+            },
+            "auction_id": self.auction_id
+        }
+        if self.journal_seq is not None:
+            data["journal_seq"] = self.journal_seq
+        return data
+
+def json_default(obj):
+    """``json.dumps`` hook for records"""
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
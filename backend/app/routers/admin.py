@@ -0,0 +1,49 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.config import settings
+from app.models import User
+from app.auth import get_current_admin_user
+from app.profiling import profiles, route_class
+from app.websocket import manager
+from app.journal import sale_journal
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=route_class)
+
+@router.get("/profiles")
+async def get_profiles(current_user: User = Depends(get_current_admin_user)):
+    """Slowest profiled requests since startup (or the last reset)"""
+    return {
+        "enabled": settings.PROFILING_ENABLED,
+        "sample_rate": settings.PROFILING_SAMPLE_RATE,
+        "profiles": [profile.to_dict() for profile in profiles.slowest()]
+    }
+
+@router.delete("/profiles", status_code=204)
+async def clear_profiles(current_user: User = Depends(get_current_admin_user)):
+    profiles.clear()
+
+def _authorize_drain(drain_token: Optional[str] = Header(None, alias="X-Drain-Token")):
+    """Deploy hooks cannot hold a user JWT: require the shared DRAIN_TOKEN.
+    Without one configured the endpoint is disabled."""
+    if not settings.DRAIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Drain is disabled: DRAIN_TOKEN is not set")
+    if not drain_token or not secrets.compare_digest(drain_token, settings.DRAIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid drain token")
+
+@router.post("/drain", dependencies=[Depends(_authorize_drain)])
+async def drain():
+    """Pre-stop hook: send live clients away with jittered reconnect delays
+    and flush journaled sales, before the server starts shutting down.
+
+    Call it from the platform's pre-stop hook, ahead of SIGTERM:
+    ``curl -X POST -H "X-Drain-Token: $DRAIN_TOKEN" localhost:$PORT/admin/drain``.
+    Uvicorn waits for open connections before lifespan shutdown, so without
+    it WebSocket and SSE clients are only cut off at the graceful timeout.
+    """
+    closed = await manager.drain()
+    if sale_journal.running:
+        await sale_journal.flush_all()
+    return {"draining": True, **closed}
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.database import get_read_db
+from app.models import Project, User
+from app.auth import get_current_read_user
+from app.analytics import analytics_cache, premiums, spend_curves, contested_categories
+from app.profiling import route_class
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], route_class=route_class)
+
+async def _project_analytics(project_id: int, db: AsyncSession, current_user: User):
+    # Verify access
+    result = await db.execute(
+        select(Project.id).where(Project.id == project_id, Project.owner_id == current_user.id)
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    return await analytics_cache.get(db, project_id)
+
+@router.get("/{project_id}/premiums")
+async def get_premiums(
+    project_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    data = await _project_analytics(project_id, db, current_user)
+    return await data.report("premiums", premiums)
+
+@router.get("/{project_id}/spend-curves")
+async def get_spend_curves(
+    project_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    data = await _project_analytics(project_id, db, current_user)
+    return await data.report("spend_curves", spend_curves)
+
+@router.get("/{project_id}/contested-categories")
+async def get_contested_categories(
+    project_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    data = await _project_analytics(project_id, db, current_user)
+    return await data.report("contested_categories", contested_categories)
@@ -1,24 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi import APIRouter, Depends, Header, HTTPException, WebSocket, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, and_
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_db, get_read_db, async_session, mark_project_written
 from app.models import Player, Team, Auction, Project, PlayerStatus, User
 from app.schemas import AuctionCreate, AuctionResponse, Player as PlayerSchema, Team as TeamSchema
-from app.auth import get_current_user, get_current_active_user
+from app.auth import get_current_user, get_current_active_user, get_current_read_user, create_view_token, verify_view_token
+from app.config import settings
 from app.websocket import manager, notify_player_sold, notify_undo
+from app.player_pool import player_pool
+from app.budget import budget_engines
+from app.squad_rules import squad_rules
+from app.idempotency import idempotency, fingerprint
+from app.journal import sale_journal
+from app.analytics import analytics_cache
+from app.records import SaleRecord
+from app.lifecycle import lifecycle, ensure_project_writable
+from app.profiling import route_class
 
-router = APIRouter(prefix="/auction", tags=["auction"])
+router = APIRouter(prefix="/auction", tags=["auction"], route_class=route_class)
 
 @router.post("/sell")
 async def sell_player(
     auction_data: AuctionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
+    sell = _sell_player_journaled if sale_journal.running else _sell_player
+    if not idempotency_key:
+        return await sell(auction_data, db)
+    
+    # Retries replay the first response without touching row locks
+    return await idempotency.run(
+        db,
+        f"{current_user.id}:sell:{idempotency_key}",
+        fingerprint(auction_data.model_dump_json()),
+        lambda: sell(auction_data, db)
+    )
+
+async def _check_sale_rules(db: AsyncSession, project_id: int, team, player, price: float):
+    """Budget, feasibility and squad-rule checks shared by both sell paths"""
+    if team.remaining_budget < price:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Insufficient budget. Available: {team.remaining_budget}, Required: {price}"
+        )
+    
+    budget = await budget_engines.get(db, project_id)
+    if budget and budget.enforce:
+        max_bid = budget.max_bid(team.remaining_budget, team.players_count, player.id)
+        if price > max_bid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Bid leaves too little budget to fill the squad. Max bid: {max_bid}, Required: {price}"
+            )
+    
+    rules = await squad_rules.get(db, project_id)
+    if rules and rules.active:
+        violation = rules.check(team.id, player.role, player.category)
+        if violation:
+            raise HTTPException(status_code=400, detail=violation)
+
+def _record_sale(project_id: int, team_id: int, player):
+    mark_project_written(project_id)
+    player_pool.remove(project_id, player.id)
+    budget_engines.mark_sold(project_id, player.id)
+    squad_rules.record_sale(project_id, team_id, player.role, player.category)
+    analytics_cache.invalidate(project_id)
+
+async def _sell_player(auction_data: AuctionCreate, db: AsyncSession):
     async with db.begin_nested():
         # Lock player row
         result = await db.execute(
@@ -34,6 +89,8 @@ async def sell_player(
         if player.status == PlayerStatus.SOLD:
             raise HTTPException(status_code=400, detail="Player already sold")
         
+        await ensure_project_writable(db, player.project_id)
+        
         # Lock team row
         team_result = await db.execute(
             select(Team)
@@ -48,11 +105,7 @@ async def sell_player(
         if team.project_id != player.project_id:
             raise HTTPException(status_code=400, detail="Team and player not in same project")
         
-        if team.remaining_budget < auction_data.price:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Insufficient budget. Available: {team.remaining_budget}, Required: {auction_data.price}"
-            )
+        await _check_sale_rules(db, player.project_id, team, player, auction_data.price)
         
         # Create auction record
         auction = Auction(
@@ -76,6 +129,8 @@ async def sell_player(
         
         # Commit happens automatically when exiting context manager
     
+    _record_sale(player.project_id, team.id, player)
+    
     # Now transaction is committed, fetch fresh data for response
     result = await db.execute(
         select(Auction)
@@ -87,24 +142,7 @@ async def sell_player(
     # Broadcast update
     await notify_player_sold(
         player.project_id,
-        {
-            "player": {
-                "id": player.id,
-                "name": player.name,
-                "sold_price": player.sold_price,
-                "category": player.category,
-                "role": player.role,
-                "points": player.points,
-                "team_id": team.id,
-                "team_name": team.name
-            },
-            "team": {
-                "id": team.id,
-                "remaining_budget": team.remaining_budget,
-                "players_count": team.players_count
-            },
-            "auction_id": auction.id
-        }
+        SaleRecord(player, team, player.sold_price, auction.id)
     )
     
     return {
@@ -115,12 +153,83 @@ async def sell_player(
         "price": auction.price
     }
 
+async def _sell_player_journaled(auction_data: AuctionCreate, db: AsyncSession):
+    """Validate against the in-memory ledger and ack once the sale is
+    fsynced to the journal; the database catches up in the background"""
+    ledger = await sale_journal.ledger_for_player(db, auction_data.player_id)
+    if ledger is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    
+    async with ledger.lock:
+        # From memory: a round trip here would undo the point of the journal
+        lifecycle.ensure_writable(ledger.project_id)
+        
+        player = ledger.players[auction_data.player_id]
+        if player.sold:
+            raise HTTPException(status_code=400, detail="Player already sold")
+        
+        team = ledger.teams.get(auction_data.team_id)
+        if team is None:
+            team_result = await db.execute(select(Team.id).where(Team.id == auction_data.team_id))
+            if not team_result.scalar_one_or_none():
+                raise HTTPException(status_code=404, detail="Team not found")
+            raise HTTPException(status_code=400, detail="Team and player not in same project")
+        
+        await _check_sale_rules(db, ledger.project_id, team, player, auction_data.price)
+        
+        entry = {
+            "project_id": ledger.project_id,
+            "player_id": player.id,
+            "team_id": team.id,
+            "price": auction_data.price,
+            "sold_at": datetime.utcnow().isoformat()
+        }
+        ledger.apply_sale(entry)
+        try:
+            await sale_journal.append(entry)
+        except Exception:
+            ledger.revert_sale(player.id, team.id, auction_data.price)
+            raise HTTPException(status_code=503, detail="Could not record sale, please retry")
+    
+    _record_sale(ledger.project_id, team.id, player)
+    
+    # The auction row does not exist until the journal is flushed
+    await notify_player_sold(
+        ledger.project_id,
+        SaleRecord(player, team, auction_data.price, journal_seq=entry["seq"])
+    )
+    
+    return {
+        "success": True,
+        "auction_id": None,
+        "journal_seq": entry["seq"],
+        "player_name": player.name,
+        "team_name": team.name,
+        "price": auction_data.price
+    }
+
 @router.post("/undo/{auction_id}")
 async def undo_auction(
     auction_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
+    if not idempotency_key:
+        return await _undo_auction(auction_id, db, current_user)
+    
+    return await idempotency.run(
+        db,
+        f"{current_user.id}:undo:{idempotency_key}",
+        fingerprint(str(auction_id)),
+        lambda: _undo_auction(auction_id, db, current_user)
+    )
+
+async def _undo_auction(auction_id: int, db: AsyncSession, current_user: User):
+    if sale_journal.running:
+        # Undo works on auction rows, so journaled sales must land first
+        await sale_journal.flush_all()
+    
     result = await db.execute(
         select(Auction)
         .options(selectinload(Auction.player), selectinload(Auction.team))
@@ -138,6 +247,8 @@ async def undo_auction(
     if not project_result.scalar_one_or_none():
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    await ensure_project_writable(db, auction.project_id)
+    
     async with db.begin_nested():
         team_result = await db.execute(
             select(Team).where(Team.id == auction.team_id).with_for_update()
@@ -162,6 +273,12 @@ async def undo_auction(
         auction.is_reverted = True
         
         await db.commit()
+        mark_project_written(auction.project_id)
+        player_pool.add(auction.project_id, player)
+        budget_engines.mark_unsold(auction.project_id, player.id)
+        squad_rules.record_undo(auction.project_id, team.id, player.role, player.category)
+        sale_journal.record_undo(auction.project_id, player.id, team.id, auction.price)
+        analytics_cache.invalidate(auction.project_id)
         
         await notify_undo(auction.project_id, auction_id)
         
@@ -170,8 +287,8 @@ async def undo_auction(
 @router.get("/live-data/{project_id}")
 async def get_live_auction_data(
     project_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     # Verify access
     project_result = await db.execute(
@@ -180,6 +297,9 @@ async def get_live_auction_data(
     if not project_result.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Project not found")
     
+    if sale_journal.running and sale_journal.has_unflushed(project_id):
+        await sale_journal.flush_all()
+    
     # Get teams
     teams_result = await db.execute(
         select(Team).where(Team.project_id == project_id)
@@ -216,6 +336,102 @@ async def get_live_auction_data(
         "recent_sales": recent_auctions
     }
 
+@router.get("/next-lot/{project_id}")
+async def get_next_lot(
+    project_id: int,
+    category: Optional[str] = None,
+    role: Optional[str] = None,
+    random: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    # Verify access
+    project_result = await db.execute(
+        select(Project).where(Project.id == project_id, Project.owner_id == current_user.id)
+    )
+    if not project_result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    pool = await player_pool.get(db, project_id)
+    if random:
+        player = pool.random_lot(category, role)
+    else:
+        player = pool.next_lot(category, role)
+    
+    if player is None:
+        raise HTTPException(status_code=404, detail="No unsold players match")
+    
+    return {"player": player.to_dict(), "remaining": len(pool)}
+
+@router.get("/queue/{project_id}")
+async def get_auction_queue(
+    project_id: int,
+    category: Optional[str] = None,
+    role: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    # Verify access
+    project_result = await db.execute(
+        select(Project).where(Project.id == project_id, Project.owner_id == current_user.id)
+    )
+    if not project_result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    pool = await player_pool.get(db, project_id)
+    return {
+        "remaining": len(pool),
+        "players": [player.to_dict() for player in pool.queue(category, role, limit)]
+    }
+
+@router.get("/max-bid/{project_id}")
+async def get_max_bids(
+    project_id: int,
+    player_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    # Verify access
+    project_result = await db.execute(
+        select(Project).where(Project.id == project_id, Project.owner_id == current_user.id)
+    )
+    if not project_result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    base_price = None
+    if player_id is not None:
+        player_result = await db.execute(
+            select(Player.base_price).where(Player.id == player_id, Player.project_id == project_id)
+        )
+        base_price = player_result.scalar_one_or_none()
+        if base_price is None:
+            raise HTTPException(status_code=404, detail="Player not found")
+    
+    budget = await budget_engines.get(db, project_id)
+    teams_result = await db.execute(
+        select(Team).where(Team.project_id == project_id)
+    )
+    
+    teams = []
+    for team in teams_result.scalars().all():
+        max_bid = budget.max_bid(team.remaining_budget, team.players_count, player_id)
+        teams.append({
+            "team_id": team.id,
+            "team_name": team.name,
+            "remaining_budget": team.remaining_budget,
+            "players_count": team.players_count,
+            "slots_left": budget.slots_left(team.players_count),
+            "max_bid": max_bid,
+            "can_bid": base_price is None or max_bid >= base_price
+        })
+    
+    return {
+        "squad_size": budget.squad_size,
+        "enforced": budget.enforce,
+        "teams": teams
+    }
+
 @router.websocket("/ws/{project_id}")
 async def websocket_endpoint(
     websocket: WebSocket, 
@@ -233,10 +449,67 @@ async def websocket_endpoint(
             await websocket.close(code=4001)
             return
     
-    await manager.connect(websocket, project_id)
-    try:
-        while True:
-            data = await websocket.receive_text()
-            await websocket.send_json({"type": "ping", "timestamp": datetime.utcnow().isoformat()})
-    except WebSocketDisconnect:
-        await manager.disconnect(websocket, project_id)
\ No newline at end of file
+    await manager.serve(websocket, project_id)
+
+@router.post("/view-token/{project_id}")
+async def create_spectator_token(
+    project_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    # Verify access
+    project_result = await db.execute(
+        select(Project).where(Project.id == project_id, Project.owner_id == current_user.id)
+    )
+    if not project_result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    return {
+        "view_token": create_view_token(project_id),
+        "expires_in": settings.VIEW_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+@router.websocket("/spectate/{project_id}")
+async def spectator_endpoint(
+    websocket: WebSocket,
+    project_id: int,
+    vt: str
+):
+    # Signature check only: no session, no user lookup
+    if not verify_view_token(vt, project_id):
+        await websocket.close(code=4001)
+        return
+    
+    await manager.serve(websocket, project_id, spectator=True)
+
+@router.get("/events/{project_id}")
+async def stream_events(
+    project_id: int,
+    token: Optional[str] = None,
+    vt: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """Server-Sent Events fallback for clients that cannot open WebSockets.
+
+    EventSource cannot send headers, so credentials come in the query
+    string: a spectator view token (``vt``) or a user access token.
+    """
+    if vt is not None:
+        if not verify_view_token(vt, project_id):
+            raise HTTPException(status_code=401, detail="Invalid view token")
+    elif token is not None:
+        async with async_session() as db:
+            user = await get_current_user(token, db)
+            project_result = await db.execute(
+                select(Project.id).where(Project.id == project_id, Project.owner_id == user.id)
+            )
+            if not project_result.scalar_one_or_none():
+                raise HTTPException(status_code=404, detail="Project not found")
+    else:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    return StreamingResponse(
+        manager.stream(project_id, last_event_id, spectator=vt is not None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -5,14 +5,15 @@ from sqlalchemy import select
 from datetime import timedelta
 
 from app.database import get_db
-from app.models import User
+from app.models import User, UserRole
 from app.schemas import UserCreate, User as UserSchema, Token
 from app.auth import (
     get_password_hash, verify_password, create_access_token, 
     get_current_active_user, settings
 )
+from app.profiling import route_class
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=route_class)
 
 @router.post("/signup", response_model=UserSchema)
 async def signup(user: UserCreate, db: AsyncSession = Depends(get_db)):
@@ -52,7 +53,8 @@ async def login(
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
+        data={"sub": str(user.id), "role": (user.role or UserRole.USER).value},
+        expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
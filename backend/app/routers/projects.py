@@ -1,15 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, insert, update, func, case, literal
 from typing import List
-from sqlalchemy import select, delete, update
 
-from app.database import get_db
-from app.models import Project, Team, Player, Auction, User  # Added Auction here
-from app.schemas import ProjectCreate, Project as ProjectSchema, ProjectDetail
-from app.auth import get_current_active_user
+from app.database import get_db, get_read_db, mark_project_written, mark_user_written
+from app.models import Project, ProjectArchive, Team, Player, PlayerStatus, User
+from app.schemas import ProjectCreate, ProjectClone, Project as ProjectSchema, ProjectDetail, ProjectSummary
+from app.auth import get_current_active_user, get_current_read_user
+from app.budget import budget_engines
+from app.squad_rules import squad_rules
+from app.lifecycle import lifecycle, ensure_project_writable, snapshot_totals
+from app.profiling import route_class
 
-router = APIRouter(prefix="/projects", tags=["projects"])
+router = APIRouter(prefix="/projects", tags=["projects"], route_class=route_class)
+
+# Fields a project's owner may PATCH
+UPDATABLE_FIELDS = (
+    "name", "total_teams", "squad_size", "enforce_budget_feasibility", "squad_rules", "own_team_id"
+)
+
+def _listed(project) -> bool:
+    # Hide projects that are on their way out; one whose delete job failed
+    # stays visible so it can be retried
+    return project.status != "deleting" or not lifecycle.in_progress(project.id)
 
 @router.post("/", response_model=ProjectSchema)
 async def create_project(
@@ -20,74 +33,87 @@ async def create_project(
     db_project = Project(
         name=project.name,
         total_teams=project.total_teams,
+        squad_size=project.squad_size,
+        enforce_budget_feasibility=project.enforce_budget_feasibility,
+        squad_rules=project.squad_rules.model_dump() if project.squad_rules else None,
         owner_id=current_user.id
     )
     db.add(db_project)
     await db.commit()
+    mark_user_written(current_user.id)
     await db.refresh(db_project)
     return db_project
 
 @router.get("/", response_model=List[ProjectSchema])
 async def list_projects(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
-    result = await db.execute(
-        select(Project).where(Project.owner_id == current_user.id)
-    )
-    return result.scalars().all()
+    result = await db.execute(select(Project).where(Project.owner_id == current_user.id))
+    return [project for project in result.scalars().all() if _listed(project)]
 
-@router.delete("/{project_id}")
-async def delete_project(
-    project_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+@router.get("/dashboard", response_model=List[ProjectSummary])
+async def get_dashboard(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
-    """Delete a project and all its data"""
+    """Per-project progress for the home page in a single grouped query"""
+    # Restrict the aggregates to this user's projects before grouping
+    owned = select(Project.id).where(Project.owner_id == current_user.id)
+    team_stats = (
+        select(Team.project_id, func.count(Team.id).label("team_count"))
+        .where(Team.project_id.in_(owned))
+        .group_by(Team.project_id)
+        .subquery()
+    )
+    is_sold = Player.status == PlayerStatus.SOLD
+    player_stats = (
+        select(
+            Player.project_id,
+            func.sum(case((is_sold, 1), else_=0)).label("sold_count"),
+            func.sum(case((is_sold, 0), else_=1)).label("unsold_count"),
+            func.sum(case((is_sold, Player.sold_price), else_=0)).label("total_spend"),
+            func.max(Player.sold_at).label("last_sale_at")
+        )
+        .where(Player.project_id.in_(owned))
+        .group_by(Player.project_id)
+        .subquery()
+    )
     
-    # Check project exists and belongs to user
     result = await db.execute(
-        select(Project).where(Project.id == project_id, Project.owner_id == current_user.id)
+        select(
+            Project.id,
+            Project.name,
+            Project.status,
+            Project.total_teams,
+            Project.created_at,
+            func.coalesce(team_stats.c.team_count, 0).label("team_count"),
+            func.coalesce(player_stats.c.sold_count, 0).label("sold_count"),
+            func.coalesce(player_stats.c.unsold_count, 0).label("unsold_count"),
+            func.coalesce(player_stats.c.total_spend, 0).label("total_spend"),
+            player_stats.c.last_sale_at
+        )
+        .outerjoin(team_stats, team_stats.c.project_id == Project.id)
+        .outerjoin(player_stats, player_stats.c.project_id == Project.id)
+        .where(Project.owner_id == current_user.id)
+        .order_by(Project.created_at.desc())
     )
-    project = result.scalar_one_or_none()
+    rows = [row for row in result.all() if _listed(row)]
     
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    try:
-        # 1. Clear own_team_id reference first
-        await db.execute(
-            update(Project)
-            .where(Project.id == project_id)
-            .values(own_team_id=None)
+    # Archived projects keep their totals only in the snapshot
+    archived = [row.id for row in rows if row.status == "archived"]
+    totals = {}
+    if archived:
+        snapshots = await db.execute(
+            select(ProjectArchive.project_id, ProjectArchive.snapshot)
+            .where(ProjectArchive.project_id.in_(archived))
         )
-        
-        # 2. Delete auctions
-        await db.execute(
-            delete(Auction).where(Auction.project_id == project_id)
-        )
-        
-        # 3. Delete players
-        await db.execute(
-            delete(Player).where(Player.project_id == project_id)
-        )
-        
-        # 4. Delete teams
-        await db.execute(
-            delete(Team).where(Team.project_id == project_id)
-        )
-        
-        # 5. Delete project
-        await db.execute(
-            delete(Project).where(Project.id == project_id)
-        )
-        
-        await db.commit()
-        return {"message": "Project deleted successfully"}
-        
-    except Exception as e:
-        await db.rollback()
-        raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}")
+        totals = {project_id: snapshot_totals(snapshot) for project_id, snapshot in snapshots.all()}
+    
+    return [
+        ProjectSummary.model_validate({**row._mapping, **totals.get(row.id, {})})
+        for row in rows
+    ]
 
 @router.patch("/{project_id}", response_model=ProjectSchema)
 async def update_project(
@@ -104,51 +130,169 @@ async def update_project(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
+    # status belongs to lifecycle jobs, ids and ownership to the server
+    rejected = sorted(set(project_update) - set(UPDATABLE_FIELDS))
+    if rejected:
+        raise HTTPException(status_code=400, detail=f"Cannot update: {', '.join(rejected)}")
+    
+    await ensure_project_writable(db, project_id)
+    
     for key, value in project_update.items():
         setattr(project, key, value)
     
     await db.commit()
+    mark_project_written(project_id)
+    mark_user_written(current_user.id)
+    budget_engines.invalidate(project_id)
+    squad_rules.invalidate(project_id)
     await db.refresh(project)
     return project
 
-@router.delete("/{project_id}")
-async def delete_project(
+@router.post("/{project_id}/clone", response_model=ProjectSchema)
+async def clone_project(
     project_id: int,
+    options: ProjectClone,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Delete a project and all its data (teams, players, auctions)"""
-    
-    # Verify project exists and belongs to user
+    """Copy a project's settings, teams and player pool into a new project.
+
+    Rows are copied inside the database with INSERT ... SELECT; players come
+    back unsold and teams with their full budgets.
+    """
     result = await db.execute(
         select(Project).where(Project.id == project_id, Project.owner_id == current_user.id)
     )
-    project = result.scalar_one_or_none()
+    source = result.scalar_one_or_none()
     
-    if not project:
+    if not source:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Delete in correct order to avoid foreign key constraints
-    # 1. Delete auctions
-    await db.execute(
-        delete(Auction).where(Auction.project_id == project_id)
-    )
+    # Archived projects keep only their snapshot
+    if source.status in ("deleting", "archiving", "archived"):
+        raise HTTPException(status_code=400, detail=f"Project is {source.status}")
     
-    # 2. Delete players
-    await db.execute(
-        delete(Player).where(Player.project_id == project_id)
+    clone = Project(
+        name=options.name or f"{source.name} (copy)",
+        total_teams=source.total_teams,
+        squad_size=source.squad_size,
+        enforce_budget_feasibility=source.enforce_budget_feasibility,
+        squad_rules=source.squad_rules,
+        owner_id=current_user.id
     )
+    db.add(clone)
+    await db.flush()
     
-    # 3. Delete teams
-    await db.execute(
-        delete(Team).where(Team.project_id == project_id)
-    )
+    if options.include_teams:
+        await db.execute(
+            insert(Team).from_select(
+                ["project_id", "name", "initial_budget", "remaining_budget", "players_count", "color"],
+                select(
+                    literal(clone.id), Team.name, Team.initial_budget,
+                    Team.initial_budget, literal(0), Team.color
+                )
+                .where(Team.project_id == project_id)
+                .order_by(Team.id)
+            )
+        )
+        
+        # Own team is matched by name in the copy
+        if source.own_team_id is not None:
+            own_team_name = select(Team.name).where(Team.id == source.own_team_id).scalar_subquery()
+            own_team_id = (
+                select(func.min(Team.id))
+                .where(Team.project_id == clone.id, Team.name == own_team_name)
+                .scalar_subquery()
+            )
+            await db.execute(
+                update(Project).where(Project.id == clone.id).values(own_team_id=own_team_id)
+            )
+    
+    if options.include_players:
+        await db.execute(
+            insert(Player).from_select(
+                ["project_id", "name", "base_price", "category", "role", "points", "status"],
+                select(
+                    literal(clone.id), Player.name, Player.base_price, Player.category,
+                    Player.role, Player.points, literal(PlayerStatus.UNSOLD, Player.status.type)
+                )
+                .where(Player.project_id == project_id)
+                .order_by(Player.id)
+            )
+        )
     
-    # 4. Delete project
-    await db.execute(
-        delete(Project).where(Project.id == project_id)
+    await db.commit()
+    mark_user_written(current_user.id)
+    await db.refresh(clone)
+    return clone
+
+async def _start_lifecycle_job(project_id: int, kind: str, db: AsyncSession, current_user: User):
+    result = await db.execute(
+        select(Project).where(Project.id == project_id, Project.owner_id == current_user.id)
     )
+    project = result.scalar_one_or_none()
     
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # A failed (or, after a restart, missing) job may be started again
+    if lifecycle.in_progress(project_id):
+        raise HTTPException(status_code=400, detail=f"Project is already {project.status}")
+    if kind == "archive" and project.status in ("deleting", "archived"):
+        raise HTTPException(status_code=400, detail=f"Project is already {project.status}")
+    
+    # Commit the status before the job's own transactions start
+    project.status = "deleting" if kind == "delete" else "archiving"
     await db.commit()
+    mark_user_written(current_user.id)
+    
+    return lifecycle.start(project_id, kind, current_user.id)
+
+@router.delete("/{project_id}", status_code=202)
+async def delete_project(
+    project_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Delete a project and all its data in chunked background batches"""
+    job = await _start_lifecycle_job(project_id, "delete", db, current_user)
+    return {"message": "Project deletion started", "job": job.to_dict()}
+
+@router.post("/{project_id}/archive", status_code=202)
+async def archive_project(
+    project_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Snapshot a finished project and remove its teams, players and sales"""
+    job = await _start_lifecycle_job(project_id, "archive", db, current_user)
+    return {"message": "Project archival started", "job": job.to_dict()}
+
+@router.get("/{project_id}/lifecycle")
+async def get_lifecycle_job(
+    project_id: int,
+    current_user: User = Depends(get_current_active_user)
+):
+    # A finished delete has removed the project row, so ownership is
+    # checked against the job itself
+    job = lifecycle.get(project_id)
+    if not job or job.owner_id != current_user.id:
+        raise HTTPException(status_code=404, detail="No lifecycle job for this project")
+    return job.to_dict()
+
+@router.get("/{project_id}/archive")
+async def get_project_archive(
+    project_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    result = await db.execute(
+        select(ProjectArchive.snapshot)
+        .join(Project, Project.id == ProjectArchive.project_id)
+        .where(ProjectArchive.project_id == project_id, Project.owner_id == current_user.id)
+    )
+    snapshot = result.scalar_one_or_none()
     
-    return {"message": "Project deleted successfully"}
\ No newline at end of file
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Archive not found")
+    return snapshot
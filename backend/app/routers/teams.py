@@ -1,13 +1,51 @@
+import colorsys
+from typing import Iterable, List
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
 
-from app.database import get_db
+from app.database import get_db, get_read_db, mark_project_written
 from app.models import Team, Project, User
-from app.schemas import TeamCreate, Team as TeamSchema
-from app.auth import get_current_active_user
+from app.schemas import TeamCreate, TeamBulkCreate, Team as TeamSchema
+from app.auth import get_current_active_user, get_current_read_user
+from app.journal import sale_journal
+from app.lifecycle import ensure_project_writable
+from app.profiling import route_class
+
+router = APIRouter(prefix="/teams", tags=["teams"], route_class=route_class)
+
+MAX_BULK_TEAMS = 100
 
-router = APIRouter(prefix="/teams", tags=["teams"])
+# Distinct defaults, starting with the model's own default color
+TEAM_COLORS = [
+    "#3B82F6", "#EF4444", "#10B981", "#F59E0B", "#8B5CF6",
+    "#EC4899", "#14B8A6", "#F97316", "#6366F1", "#84CC16",
+    "#06B6D4", "#E11D48", "#A855F7", "#22C55E", "#EAB308",
+    "#0EA5E9", "#D946EF", "#64748B", "#B45309", "#0F766E",
+]
+
+def _team_colors(count: int, used: Iterable[str]) -> List[str]:
+    """``count`` colors not in ``used``: the palette first, then hues
+    spread around the color wheel by the golden angle."""
+    taken = {color.upper() for color in used if color}
+    colors = []
+    for color in TEAM_COLORS:
+        if len(colors) == count:
+            return colors
+        if color not in taken:
+            colors.append(color)
+            taken.add(color)
+
+    hue = 0.0
+    while len(colors) < count:
+        hue = (hue + 0.618033988749895) % 1.0
+        r, g, b = colorsys.hls_to_rgb(hue, 0.5, 0.7)
+        color = "#{:02X}{:02X}{:02X}".format(round(r * 255), round(g * 255), round(b * 255))
+        if color not in taken:
+            colors.append(color)
+            taken.add(color)
+    return colors
 
 @router.post("/", response_model=TeamSchema)
 async def create_team(
@@ -22,6 +60,8 @@ async def create_team(
     if not result.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Project not found")
     
+    await ensure_project_writable(db, team.project_id)
+    
     db_team = Team(
         project_id=team.project_id,
         name=team.name,
@@ -30,14 +70,98 @@ async def create_team(
     )
     db.add(db_team)
     await db.commit()
+    mark_project_written(team.project_id)
+    sale_journal.invalidate(team.project_id)
     await db.refresh(db_team)
     return db_team
 
+@router.post("/bulk", response_model=list[TeamSchema])
+async def create_teams_bulk(
+    request: TeamBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Create a project's teams in one multi-row INSERT ... RETURNING."""
+    # Verify project belongs to user
+    result = await db.execute(
+        select(Project).where(Project.id == request.project_id, Project.owner_id == current_user.id)
+    )
+    project = result.scalar_one_or_none()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    await ensure_project_writable(db, project.id)
+    
+    existing = (await db.execute(
+        select(Team.name, Team.color).where(Team.project_id == project.id)
+    )).all()
+    
+    if request.clone_from_project_id is not None:
+        source_result = await db.execute(
+            select(Project.id).where(
+                Project.id == request.clone_from_project_id,
+                Project.owner_id == current_user.id
+            )
+        )
+        if not source_result.scalar_one_or_none():
+            raise HTTPException(status_code=404, detail="Source project not found")
+        
+        source_teams = (await db.execute(
+            select(Team.name, Team.initial_budget, Team.color)
+            .where(Team.project_id == request.clone_from_project_id)
+            .order_by(Team.id)
+        )).all()
+        if request.count is not None:
+            source_teams = source_teams[:request.count]
+        templates = [(team.name, team.initial_budget, team.color) for team in source_teams]
+    else:
+        offset = len(existing)
+        # By default, top the project up to its configured number of teams
+        count = request.count if request.count is not None else max((project.total_teams or 0) - offset, 0)
+        templates = [
+            (f"{request.name_prefix} {offset + i + 1}", request.initial_budget, None)
+            for i in range(count or 0)
+        ]
+    
+    if not templates:
+        raise HTTPException(status_code=400, detail="No teams to create")
+    if len(templates) > MAX_BULK_TEAMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_TEAMS} teams per request")
+    
+    # Keep cloned colors unless they clash; fill the rest from the palette
+    used = {color.upper() for _, color in existing if color}
+    wanted = []
+    for _, _, color in templates:
+        if color and color.upper() not in used:
+            used.add(color.upper())
+            wanted.append(color)
+        else:
+            wanted.append(None)
+    fresh = iter(_team_colors(wanted.count(None), used))
+    
+    rows = [
+        {
+            "project_id": project.id,
+            "name": name,
+            "initial_budget": budget,
+            "remaining_budget": budget,
+            "players_count": 0,
+            "color": color or next(fresh),
+        }
+        for (name, budget, _), color in zip(templates, wanted)
+    ]
+    result = await db.execute(insert(Team).values(rows).returning(Team))
+    teams = sorted(result.scalars().all(), key=lambda team: team.id)
+    await db.commit()
+    mark_project_written(project.id)
+    sale_journal.invalidate(project.id)
+    return teams
+
 @router.get("/project/{project_id}", response_model=list[TeamSchema])
 async def get_project_teams(
     project_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
 ):
     # Verify access
     result = await db.execute(
@@ -1,14 +1,19 @@
-import pandas as pd
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select  # ADD THIS IMPORT
 from io import BytesIO
 
-from app.database import get_db
+from app.database import get_db, mark_project_written
 from app.models import Player, Project, User
 from app.auth import get_current_active_user
+from app.player_pool import player_pool
+from app.budget import budget_engines
+from app.journal import sale_journal
+from app.analytics import analytics_cache
+from app.lifecycle import ensure_project_writable
+from app.profiling import route_class
 
-router = APIRouter(prefix="/upload", tags=["upload"])
+router = APIRouter(prefix="/upload", tags=["upload"], route_class=route_class)
 
 @router.post("/players/{project_id}")
 async def upload_players(
@@ -24,9 +29,14 @@ async def upload_players(
     if not result.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Project not found")
     
+    await ensure_project_writable(db, project_id)
+    
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(400, "Only Excel files allowed")
     
+    # pandas/openpyxl are slow to import, so load them on first upload only
+    import pandas as pd
+    
     try:
         contents = await file.read()
         df = pd.read_excel(BytesIO(contents))
@@ -64,6 +74,11 @@ async def upload_players(
             players_added += 1
         
         await db.commit()
+        mark_project_written(project_id)
+        player_pool.invalidate(project_id)
+        budget_engines.invalidate(project_id)
+        sale_journal.invalidate(project_id)
+        analytics_cache.invalidate(project_id)
         return {"message": f"Successfully uploaded {players_added} players"}
         
     except Exception as e:
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from app.models import PlayerRole, PlayerStatus
 
@@ -31,6 +31,13 @@ class TeamBase(BaseModel):
 class TeamCreate(TeamBase):
     project_id: int
 
+class TeamBulkCreate(BaseModel):
+    project_id: int
+    count: Optional[int] = None  # defaults to the teams still missing from total_teams
+    initial_budget: float = 10000000.0
+    name_prefix: str = "Team"
+    clone_from_project_id: Optional[int] = None
+
 class Team(TeamBase):
     id: int
     project_id: int
@@ -91,9 +98,17 @@ class AuctionResponse(BaseModel):
         from_attributes = True
 
 # Project schemas
+class SquadRules(BaseModel):
+    min_roles: Dict[str, int] = {}
+    max_roles: Dict[str, int] = {}
+    max_categories: Dict[str, int] = {}
+
 class ProjectBase(BaseModel):
     name: str
     total_teams: int = 10
+    squad_size: Optional[int] = None
+    enforce_budget_feasibility: bool = False
+    squad_rules: Optional[SquadRules] = None
 
 class ProjectCreate(ProjectBase):
     pass
@@ -108,10 +123,27 @@ class Project(ProjectBase):
     class Config:
         from_attributes = True
 
+class ProjectClone(BaseModel):
+    name: Optional[str] = None  # defaults to "<source name> (copy)"
+    include_teams: bool = True
+    include_players: bool = True
+
 class ProjectDetail(Project):
     teams: List[Team]
     players_count: int = 0
 
+class ProjectSummary(BaseModel):
+    id: int
+    name: str
+    status: str
+    total_teams: int
+    created_at: datetime
+    team_count: int = 0
+    sold_count: int = 0
+    unsold_count: int = 0
+    total_spend: float = 0.0
+    last_sale_at: Optional[datetime] = None
+
 # Live auction data
 class LiveAuctionData(BaseModel):
     teams: List[Team]
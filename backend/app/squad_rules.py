@@ -0,0 +1,129 @@
+from collections import Counter
+from typing import Dict, Optional
+
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Player, PlayerStatus, Project
+from app.project_cache import ProjectCache
+
+def _role_key(role) -> str:
+    role = getattr(role, "value", role)
+    return (role or "").upper()
+
+def _category_key(category) -> str:
+    return (category or "").lower()
+
+class TeamSquad:
+    """Running role/category counts for one team."""
+
+    __slots__ = ("size", "roles", "categories")
+
+    def __init__(self):
+        self.size = 0
+        self.roles: Counter = Counter()
+        self.categories: Counter = Counter()
+
+    def apply(self, role, category, delta: int):
+        self.size += delta
+        self.roles[_role_key(role)] += delta
+        self.categories[_category_key(category)] += delta
+
+class SquadRuleEngine:
+    """Evaluates a project's squad rules against in-memory team counters.
+
+    Rules come from ``Project.squad_rules``::
+
+        {"min_roles": {"WK": 1}, "max_roles": {"WK": 2},
+         "max_categories": {"platinum": 2}}
+
+    and the squad size cap is ``Project.squad_size``.
+    """
+
+    def __init__(self, project_id: int, squad_size: Optional[int], rules: Optional[dict]):
+        rules = rules or {}
+        self.project_id = project_id
+        self.squad_size = squad_size
+        self.min_roles = {_role_key(k): v for k, v in (rules.get("min_roles") or {}).items()}
+        self.max_roles = {_role_key(k): v for k, v in (rules.get("max_roles") or {}).items()}
+        self.max_categories = {_category_key(k): v for k, v in (rules.get("max_categories") or {}).items()}
+        self.teams: Dict[int, TeamSquad] = {}
+
+    @property
+    def active(self) -> bool:
+        return bool(self.squad_size or self.min_roles or self.max_roles or self.max_categories)
+
+    def squad(self, team_id: int) -> TeamSquad:
+        squad = self.teams.get(team_id)
+        if squad is None:
+            squad = self.teams[team_id] = TeamSquad()
+        return squad
+
+    def check(self, team_id: int, role, category) -> Optional[str]:
+        """Return why ``team_id`` may not buy this player, or None."""
+        squad = self.squad(team_id)
+        role = _role_key(role)
+        category = _category_key(category)
+
+        if self.squad_size and squad.size + 1 > self.squad_size:
+            return f"Squad full. Max squad size: {self.squad_size}"
+
+        limit = self.max_roles.get(role)
+        if limit is not None and squad.roles[role] + 1 > limit:
+            return f"Role limit reached for {role}. Max: {limit}"
+
+        limit = self.max_categories.get(category)
+        if limit is not None and squad.categories[category] + 1 > limit:
+            return f"Category limit reached for {category}. Max: {limit}"
+
+        if self.squad_size and self.min_roles:
+            slots_after = self.squad_size - squad.size - 1
+            missing = {
+                r: minimum - squad.roles[r] - (1 if r == role else 0)
+                for r, minimum in self.min_roles.items()
+            }
+            needed = sum(n for n in missing.values() if n > 0)
+            if needed > slots_after:
+                short = ", ".join(f"{r}: {n}" for r, n in missing.items() if n > 0)
+                return f"Squad could no longer meet role minimums. Still needed: {short}, Slots left: {slots_after}"
+
+        return None
+
+    def record(self, team_id: int, role, category, delta: int = 1):
+        self.squad(team_id).apply(role, category, delta)
+
+class SquadRuleRegistry(ProjectCache[SquadRuleEngine]):
+    """Per-project rule engines, kept in sync by the sell/undo paths."""
+
+    async def load(self, db: AsyncSession, project_id: int) -> Optional[SquadRuleEngine]:
+        project_result = await db.execute(
+            select(Project.squad_size, Project.squad_rules).where(Project.id == project_id)
+        )
+        project = project_result.one_or_none()
+        if project is None:
+            return None
+
+        engine = SquadRuleEngine(project_id, project.squad_size, project.squad_rules)
+        counts_result = await db.execute(
+            select(Player.current_team_id, Player.role, Player.category, func.count(Player.id))
+            .where(
+                and_(Player.project_id == project_id,
+                     Player.status == PlayerStatus.SOLD)
+            )
+            .group_by(Player.current_team_id, Player.role, Player.category)
+        )
+        for team_id, role, category, count in counts_result.all():
+            engine.record(team_id, role, category, count)
+        return engine
+
+    def record_sale(self, project_id: int, team_id: int, role, category):
+        engine = self.touch(project_id)
+        if engine is not None:
+            engine.record(team_id, role, category, 1)
+
+    def record_undo(self, project_id: int, team_id: int, role, category):
+        engine = self.touch(project_id)
+        if engine is not None:
+            engine.record(team_id, role, category, -1)
+
+squad_rules = SquadRuleRegistry()
@@ -0,0 +1,73 @@
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger("app.startup")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class StartupTimer:
+    """Records how long each boot phase takes, up to the first request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: Dict[str, float] = {}
+        self.first_request_after: Optional[float] = None
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = round(now - self._last, 4)
+        self._last = now
+        logger.info("startup phase %s took %.3fs", phase, self.phases[phase])
+
+    def first_request(self):
+        if self.first_request_after is not None:
+            return
+        self.first_request_after = round(time.perf_counter() - self.started, 4)
+        logger.info("time to first request %.3fs", self.first_request_after)
+
+    def as_dict(self):
+        return {
+            "phases": self.phases,
+            "first_request_after": self.first_request_after,
+        }
+
+startup_timer = StartupTimer()
+
+class FirstRequestMiddleware:
+    """Pure ASGI middleware that stamps the first HTTP/WebSocket request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if startup_timer.first_request_after is None and scope["type"] in ("http", "websocket"):
+            startup_timer.first_request()
+        await self.app(scope, receive, send)
+
+def _alembic_head() -> str:
+    # Imported lazily: alembic is only needed when migrations own the schema
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+async def check_schema_at_head(conn):
+    """Fail fast if the database has not been migrated to the latest revision."""
+    from sqlalchemy import text
+
+    head = _alembic_head()
+    try:
+        result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        current = result.scalar_one_or_none()
+    except Exception:
+        current = None
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {head}. "
+            "Run 'alembic upgrade head' before starting the app."
+        )
@@ -1,42 +1,375 @@
-from typing import Dict, Set
-from fastapi import WebSocket
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from fastapi import WebSocket, WebSocketDisconnect
+from datetime import datetime
+from collections import deque
 import asyncio
+import json
+import random
+import secrets
+
+from app.config import settings
+from app.profiling import section
+from app.records import json_default
+
+# 1013 "try again later" when the server is at its connection cap
+CLOSE_TRY_AGAIN_LATER = 1013
+# Application-level code for clients that stopped answering heartbeats
+CLOSE_IDLE_TIMEOUT = 4008
+# 1012 "service restart" while the server drains before shutdown
+CLOSE_SERVICE_RESTART = 1012
 
 class ConnectionManager:
+    """Project rooms of live WebSocket viewers.
+
+    The server pings every WS_HEARTBEAT_INTERVAL_SECONDS and evicts sockets
+    that send nothing (no pong, no message) for WS_IDLE_TIMEOUT_SECONDS, so
+    clients that vanish without a close frame do not linger. Empty rooms
+    are removed, and connections are capped per project and globally.
+
+    Spectators (read-only big-screen displays) live in their own rooms
+    with their own caps; they hold no per-socket state beyond set
+    membership and receive the same pre-serialized broadcast text.
+
+    Broadcasting only serializes and queues: each project's frames are
+    sent by its own background task, in order, so a sale is acknowledged
+    (and its row locks released) without waiting on slow sockets.
+
+    Every broadcast also gets a per-project sequence number and is kept,
+    already framed for Server-Sent Events, in a short replay buffer so SSE
+    clients can resume with Last-Event-ID. Event ids are ``<epoch>-<seq>``:
+    sequences restart with the process, so an id from another boot (or
+    another instance) gets a ``reset`` frame rather than a wrong replay.
+    SSE streams are bounded queues fed by the same fan-out and count
+    toward the same caps as sockets; a stream that falls too far behind
+    is ended and resumes from the buffer when the client reconnects.
+
+    ``drain`` prepares a rolling restart: new sockets are refused and every
+    client is told to reconnect after its own jittered delay, so they do not
+    all hit the next instance at once.
+    """
+
     def __init__(self):
         self.active_connections: Dict[int, Set[WebSocket]] = {}
-        self.lock = asyncio.Lock()
-    
-    async def connect(self, websocket: WebSocket, project_id: int):
+        self.spectators: Dict[int, Set[WebSocket]] = {}
+        self.streams: Dict[int, Set[asyncio.Queue]] = {}
+        self.spectator_streams: Dict[int, Set[asyncio.Queue]] = {}
+        self.event_seq: Dict[int, int] = {}
+        self.history: Dict[int, Deque[Tuple[int, bytes]]] = {}
+        self.outbox: Dict[int, Deque[str]] = {}
+        self.deliveries: Dict[int, asyncio.Task] = {}
+        self.connection_count = 0
+        self.spectator_count = 0
+        self.draining = False
+        self.epoch = secrets.token_hex(4)
+
+    def _at_capacity(self, project_id: int, spectator: bool) -> bool:
+        # Sockets and SSE streams share the per-project and global caps
+        if spectator:
+            in_project = (
+                len(self.spectators.get(project_id, ()))
+                + len(self.spectator_streams.get(project_id, ()))
+            )
+            return (
+                self.spectator_count >= settings.WS_MAX_SPECTATORS
+                or in_project >= settings.WS_MAX_SPECTATORS_PER_PROJECT
+            )
+        in_project = (
+            len(self.active_connections.get(project_id, ()))
+            + len(self.streams.get(project_id, ()))
+        )
+        return (
+            self.connection_count >= settings.WS_MAX_CONNECTIONS
+            or in_project >= settings.WS_MAX_CONNECTIONS_PER_PROJECT
+        )
+
+    async def connect(self, websocket: WebSocket, project_id: int, spectator: bool = False) -> bool:
         await websocket.accept()
-        async with self.lock:
-            if project_id not in self.active_connections:
-                self.active_connections[project_id] = set()
-            self.active_connections[project_id].add(websocket)
-    
-    async def disconnect(self, websocket: WebSocket, project_id: int):
-        async with self.lock:
-            if project_id in self.active_connections:
-                self.active_connections[project_id].discard(websocket)
-    
-    async def broadcast_to_project(self, project_id: int, message: dict):
-        if project_id not in self.active_connections:
+        if self.draining:
+            await self._send_reconnect(websocket, project_id)
+            return False
+        if self._at_capacity(project_id, spectator):
+            await websocket.close(code=CLOSE_TRY_AGAIN_LATER, reason="Too many connections")
+            return False
+
+        rooms = self.spectators if spectator else self.active_connections
+        room = rooms.get(project_id)
+        if room is None:
+            room = rooms[project_id] = set()
+        room.add(websocket)
+        if spectator:
+            self.spectator_count += 1
+        else:
+            self.connection_count += 1
+        return True
+
+    async def disconnect(self, websocket: WebSocket, project_id: int, spectator: bool = False):
+        rooms = self.spectators if spectator else self.active_connections
+        room = rooms.get(project_id)
+        if room is None or websocket not in room:
+            return
+        room.discard(websocket)
+        if spectator:
+            self.spectator_count -= 1
+        else:
+            self.connection_count -= 1
+        if not room:
+            del rooms[project_id]
+
+    async def serve(self, websocket: WebSocket, project_id: int, spectator: bool = False):
+        """Accept a viewer and run its heartbeat loop until it goes away."""
+        if not await self.connect(websocket, project_id, spectator):
+            return
+
+        loop = asyncio.get_running_loop()
+        last_seen = loop.time()
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        websocket.receive_text(),
+                        timeout=settings.WS_HEARTBEAT_INTERVAL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if loop.time() - last_seen >= settings.WS_IDLE_TIMEOUT_SECONDS:
+                        await websocket.close(code=CLOSE_IDLE_TIMEOUT, reason="Heartbeat timeout")
+                        break
+                    await websocket.send_json({"type": "ping", "timestamp": datetime.utcnow().isoformat()})
+                    continue
+
+                last_seen = loop.time()
+                if message == "ping":
+                    await websocket.send_json({"type": "pong", "timestamp": datetime.utcnow().isoformat()})
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+        finally:
+            await self.disconnect(websocket, project_id, spectator)
+
+    async def _evict(self, websocket: WebSocket, project_id: int, spectator: bool):
+        """Drop a socket that missed a broadcast and close it, so the client
+        reconnects and refetches instead of silently falling behind."""
+        await self.disconnect(websocket, project_id, spectator)
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=CLOSE_TRY_AGAIN_LATER, reason="Missed updates"),
+                timeout=settings.WS_SEND_TIMEOUT_SECONDS
+            )
+        except Exception:
+            pass
+
+    async def _send(self, websocket: WebSocket, text: str) -> bool:
+        try:
+            await asyncio.wait_for(websocket.send_text(text), timeout=settings.WS_SEND_TIMEOUT_SECONDS)
+            return True
+        except Exception:
+            return False
+
+    def subscribe(
+        self, project_id: int, last_event_id: Optional[str] = None, spectator: bool = False
+    ) -> Tuple[asyncio.Queue, List[bytes]]:
+        """Register an SSE stream and return it with the frames it missed.
+
+        If ``last_event_id`` is older than the replay buffer, or was issued
+        under another epoch, a ``reset`` frame tells the client to refetch
+        live data.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SSE_QUEUE_SIZE)
+        streams = self.spectator_streams if spectator else self.streams
+        streams.setdefault(project_id, set()).add(queue)
+        if spectator:
+            self.spectator_count += 1
+        else:
+            self.connection_count += 1
+
+        backlog: List[bytes] = []
+        if last_event_id:
+            current = self.event_seq.get(project_id, 0)
+            history = self.history.get(project_id, ())
+            oldest = history[0][0] if history else current + 1
+            epoch, _, seen = last_event_id.partition("-")
+            if epoch != self.epoch or not seen.isdigit() or not oldest - 1 <= int(seen) <= current:
+                backlog.append(_sse_frame(self._event_id(current), "reset", "{}"))
+            else:
+                backlog.extend(frame for seq, frame in history if seq > int(seen))
+        return queue, backlog
+
+    def unsubscribe(self, project_id: int, queue: asyncio.Queue, spectator: bool = False):
+        rooms = self.spectator_streams if spectator else self.streams
+        streams = rooms.get(project_id)
+        if streams is None or queue not in streams:
+            return
+        streams.discard(queue)
+        if spectator:
+            self.spectator_count -= 1
+        else:
+            self.connection_count -= 1
+        if not streams:
+            del rooms[project_id]
+
+    async def stream(self, project_id: int, last_event_id: Optional[str] = None, spectator: bool = False):
+        """Yield SSE frames for one client, with keep-alive comments.
+
+        Draining, or a full server, sends the client away with a jittered
+        ``retry:``, the SSE counterpart of closing a socket with 1012/1013.
+        """
+        if self.draining or self._at_capacity(project_id, spectator):
+            yield self._reconnect_frame(project_id)
             return
-        
-        disconnected = []
-        for connection in self.active_connections[project_id]:
+        queue, backlog = self.subscribe(project_id, last_event_id, spectator)
+        try:
+            for frame in backlog:
+                yield frame
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout=settings.WS_HEARTBEAT_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(project_id, queue, spectator)
+
+    def _publish(self, project_id: int, frame: bytes):
+        for rooms, spectator in ((self.streams, False), (self.spectator_streams, True)):
+            for queue in list(rooms.get(project_id, ())):
+                try:
+                    queue.put_nowait(frame)
+                except asyncio.QueueFull:
+                    # Too slow: end the stream, the client resumes from history
+                    self.unsubscribe(project_id, queue, spectator)
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(None)
+
+    def _event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def _reconnect_message(self, project_id: int) -> dict:
+        return {
+            "type": "reconnect",
+            "delay_ms": _reconnect_delay_ms(),
+            "last_seq": self.event_seq.get(project_id, 0)
+        }
+
+    def _reconnect_frame(self, project_id: int) -> bytes:
+        message = self._reconnect_message(project_id)
+        # retry: makes EventSource wait the jittered delay before reconnecting
+        frame = _sse_frame(self._event_id(message["last_seq"]), "reconnect", json.dumps(message, separators=(",", ":")))
+        return f"retry: {message['delay_ms']}\n".encode("utf-8") + frame
+
+    async def _send_reconnect(self, websocket: WebSocket, project_id: int):
+        text = json.dumps(self._reconnect_message(project_id), separators=(",", ":"))
+        if await self._send(websocket, text):
             try:
-                await connection.send_json(message)
+                await websocket.close(code=CLOSE_SERVICE_RESTART, reason="Server restarting")
             except Exception:
-                disconnected.append(connection)
-        
-        async with self.lock:
-            for conn in disconnected:
-                self.active_connections[project_id].discard(conn)
+                pass
+
+    async def drain(self) -> dict:
+        """Refuse new sockets and send every client away with a jittered
+        reconnect delay and the last event seq it could have seen."""
+        self.draining = True
+        await self.flush()
+
+        streams = 0
+        for rooms, spectator in ((self.streams, False), (self.spectator_streams, True)):
+            for project_id, queues in list(rooms.items()):
+                for queue in list(queues):
+                    self.unsubscribe(project_id, queue, spectator)
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(self._reconnect_frame(project_id))
+                    queue.put_nowait(None)
+                    streams += 1
+
+        sockets = [
+            (websocket, project_id, spectator)
+            for rooms, spectator in ((self.active_connections, False), (self.spectators, True))
+            for project_id, room in list(rooms.items())
+            for websocket in list(room)
+        ]
+        await asyncio.gather(*(
+            self._send_reconnect(websocket, project_id)
+            for websocket, project_id, _ in sockets
+        ))
+        for websocket, project_id, spectator in sockets:
+            await self.disconnect(websocket, project_id, spectator)
+
+        return {"websockets": len(sockets), "streams": streams}
+
+    async def broadcast_to_project(self, project_id: int, message: dict):
+        """Queue ``message`` for everyone watching the project; returns
+        without waiting for delivery."""
+        with section("broadcast"):
+            self._broadcast(project_id, message)
+
+    def _broadcast(self, project_id: int, message: dict):
+        seq = self.event_seq.get(project_id, 0) + 1
+        self.event_seq[project_id] = seq
+
+        # Serialize once for viewers, spectators and SSE streams alike
+        text = json.dumps(
+            {**message, "seq": seq},
+            separators=(",", ":"), ensure_ascii=False, default=json_default
+        )
+        frame = _sse_frame(self._event_id(seq), message["type"], text)
+        history = self.history.get(project_id)
+        if history is None:
+            history = self.history[project_id] = deque(maxlen=settings.SSE_REPLAY_BUFFER)
+        history.append((seq, frame))
+        self._publish(project_id, frame)
+
+        if project_id not in self.active_connections and project_id not in self.spectators:
+            return
+        outbox = self.outbox.get(project_id)
+        if outbox is None:
+            outbox = self.outbox[project_id] = deque()
+        outbox.append(text)
+        if project_id not in self.deliveries:
+            self.deliveries[project_id] = asyncio.create_task(self._deliver(project_id))
+
+    async def _deliver(self, project_id: int):
+        """A project's broadcaster: sends queued frames one fan-out at a
+        time, then exits until the next broadcast."""
+        outbox = self.outbox[project_id]
+        try:
+            while outbox:
+                await self._fan_out(project_id, outbox.popleft())
+        finally:
+            del self.deliveries[project_id]
+            del self.outbox[project_id]
+
+    async def _fan_out(self, project_id: int, text: str):
+        viewers = self.active_connections.get(project_id, ())
+        spectators = self.spectators.get(project_id, ())
+        connections = [(connection, False) for connection in viewers]
+        connections += [(connection, True) for connection in spectators]
+        if not connections:
+            return
+        results = await asyncio.gather(*(self._send(connection, text) for connection, _ in connections))
+
+        failed = [entry for entry, ok in zip(connections, results) if not ok]
+        if failed:
+            await asyncio.gather(*(
+                self._evict(connection, project_id, spectator)
+                for connection, spectator in failed
+            ))
+
+    async def flush(self):
+        """Wait until every queued broadcast has been sent."""
+        while self.deliveries:
+            await asyncio.gather(*list(self.deliveries.values()), return_exceptions=True)
+
+def _reconnect_delay_ms() -> int:
+    return settings.DRAIN_RECONNECT_MIN_MS + random.randint(0, settings.DRAIN_RECONNECT_JITTER_MS)
+
+def _sse_frame(event_id: str, event: str, data: str) -> bytes:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
 
 manager = ConnectionManager()
 
-async def notify_player_sold(project_id: int, data: dict):
+async def notify_player_sold(project_id: int, data):
     await manager.broadcast_to_project(project_id, {
         "type": "player_sold",
         "data": data
@@ -46,4 +379,4 @@ async def notify_undo(project_id: int, auction_id: int):
     await manager.broadcast_to_project(project_id, {
         "type": "undo",
         "auction_id": auction_id
-    })
\ No newline at end of file
+    })
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+# Settings are read at import time, so point the app at a scratch SQLite
+# database before anything from ``app`` is imported
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="auction-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_PATH}"
+
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import database
+from app.main import app
+from app.models import Player
+
+database.engine.echo = False
+logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+PLAYERS = [
+    # name, base_price, category, role, points
+    ("A", 100, "Gold", "BAT", 50),
+    ("B", 50, "Gold", "WK", 70),
+    ("C", 20, "Silver", "BWL", 10),
+    ("D", 10, "Silver", "AR", None),
+    ("E", 30, "Platinum", "WK", 90),
+    ("F", 5, None, None, None),
+]
+
+def _reset_state():
+    """Forget in-memory state left by the previous test: ids restart with
+    every fresh database, so stale per-project caches would leak across."""
+    from app.analytics import analytics_cache
+    from app.budget import budget_engines
+    from app.idempotency import idempotency
+    from app.journal import sale_journal
+    from app.lifecycle import lifecycle
+    from app.player_pool import player_pool
+    from app.squad_rules import squad_rules
+    from app.websocket import manager
+
+    for cache in (player_pool, budget_engines, squad_rules, analytics_cache):
+        cache.__init__()
+    manager.__init__()
+    lifecycle.__init__()
+    idempotency._entries.clear()
+    sale_journal.ledgers.clear()
+    sale_journal.player_projects.clear()
+    database._recent_writes.clear()
+    database._recent_user_writes.clear()
+
+@pytest.fixture
+def client():
+    if os.path.exists(_DB_PATH):
+        os.remove(_DB_PATH)
+    _reset_state()
+    with TestClient(app) as client:
+        yield client
+    _reset_state()
+
+@pytest.fixture
+def journal(client, tmp_path):
+    """The sale journal, running against a scratch file."""
+    from app.journal import sale_journal
+
+    # Fresh locks and events too: each test client runs its own event loop
+    sale_journal.__init__(
+        str(tmp_path / "journal.log"), sale_journal.fsync_interval,
+        sale_journal.flush_interval, sale_journal.flush_batch_size
+    )
+    client.portal.call(sale_journal.start)
+    yield sale_journal
+    client.portal.call(sale_journal.close)
+
+def use_replica(monkeypatch, url=None):
+    """Route read sessions to a second engine standing in for a replica;
+    by default it reads the same database, i.e. a replica with no lag."""
+    read_engine = create_async_engine(url or os.environ["DATABASE_URL"])
+    monkeypatch.setattr(database, "read_engine", read_engine)
+    monkeypatch.setattr(database, "async_read_session", async_sessionmaker(
+        read_engine, class_=AsyncSession, expire_on_commit=False
+    ))
+    return read_engine
+
+def signup(client, email="owner@example.com", password="secret"):
+    client.post("/auth/signup", json={"email": email, "password": password})
+    response = client.post("/auth/login", data={"username": email, "password": password})
+    return {"Authorization": "Bearer " + response.json()["access_token"]}
+
+@pytest.fixture
+def auth(client):
+    return signup(client)
+
+def add_players(client, project_id, players=PLAYERS):
+    async def insert():
+        async with database.async_session() as db:
+            rows = [
+                Player(project_id=project_id, name=name, base_price=base_price,
+                       category=category, role=role, points=points)
+                for name, base_price, category, role, points in players
+            ]
+            db.add_all(rows)
+            await db.commit()
+            return [row.id for row in rows]
+    return client.portal.call(insert)
+
+def create_project(client, auth, teams=2, players=PLAYERS, **fields):
+    """A project with ``teams`` teams of budget 1000 and the given players."""
+    project = client.post("/projects/", json={"name": "Test", "total_teams": teams, **fields}, headers=auth)
+    project_id = project.json()["id"]
+    team_ids = [
+        client.post(
+            "/teams/",
+            json={"name": f"Team {i}", "project_id": project_id, "initial_budget": 1000},
+            headers=auth
+        ).json()["id"]
+        for i in range(teams)
+    ]
+    player_ids = add_players(client, project_id, players)
+    return project_id, team_ids, player_ids
+
+def wait_for_job(client, auth, project_id, timeout=5.0):
+    """Poll a project's lifecycle job until it finishes."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/projects/{project_id}/lifecycle", headers=auth).json()
+        if job.get("status") not in ("pending", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+class FakeSocket:
+    """Just enough of a WebSocket for the connection manager."""
+
+    def __init__(self, send_delay: float = 0, broken: bool = False):
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.sent = []
+        self.closed = None
+        self.send_delay = send_delay
+        self.broken = broken
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000, reason=None):
+        self.closed = code
+        self.incoming.put_nowait(None)
+
+    async def send_text(self, text):
+        if self.broken:
+            raise RuntimeError("connection lost")
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        self.sent.append(text)
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+    async def receive_text(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise WebSocketDisconnect()
+        return message
+
+    def types(self):
+        return [message["type"] for message in self.sent if isinstance(message, dict)]
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.analytics import analytics_cache
+from app.project_cache import ProjectCache
+
+from conftest import create_project, wait_for_job
+
+def _sell(client, auth, player_id, team_id, price):
+    client.post(
+        "/auction/sell", json={"player_id": player_id, "team_id": team_id, "price": price}, headers=auth
+    )
+
+@pytest.fixture
+def auction(client, auth):
+    project_id, team_ids, player_ids = create_project(client, auth)
+    _sell(client, auth, player_ids[0], team_ids[0], 200)  # A Gold BAT, base 100
+    _sell(client, auth, player_ids[1], team_ids[1], 50)   # B Gold WK, base 50
+    _sell(client, auth, player_ids[2], team_ids[0], 40)   # C Silver BWL, base 20
+    return project_id, team_ids, player_ids
+
+def test_premiums_by_role_and_category(client, auth, auction):
+    project_id, _, _ = auction
+    rows = client.get(f"/analytics/{project_id}/premiums", headers=auth).json()
+    assert [(row["role"], row["category"], row["avg_premium"]) for row in rows] == [
+        ("BAT", "Gold", 100.0), ("BWL", "Silver", 20.0), ("WK", "Gold", 0.0)
+    ]
+    assert rows[0]["avg_premium_ratio"] == 2.0
+
+def test_spend_curves_and_contested_categories(client, auth, auction):
+    project_id, _, _ = auction
+    curves = client.get(f"/analytics/{project_id}/spend-curves", headers=auth).json()
+    spend = {curve["team_name"]: [point["cumulative_spend"] for point in curve["points"]] for curve in curves}
+    assert spend == {"Team 0": [200.0, 240.0], "Team 1": [50.0]}
+
+    categories = client.get(f"/analytics/{project_id}/contested-categories", headers=auth).json()
+    by_category = {row["category"]: row for row in categories}
+    assert by_category["Gold"]["sell_through"] == 1.0
+    assert by_category["Silver"]["sell_through"] == 0.5
+    assert by_category["Platinum"]["sold"] == 0
+    assert categories[0]["category"] == "Gold"
+
+def test_sales_refresh_the_cached_frames(client, auth, auction):
+    project_id, team_ids, player_ids = auction
+    client.get(f"/analytics/{project_id}/premiums", headers=auth)
+    assert project_id in analytics_cache._items
+
+    _sell(client, auth, player_ids[4], team_ids[1], 35)
+    assert project_id not in analytics_cache._items
+    rows = client.get(f"/analytics/{project_id}/premiums", headers=auth).json()
+    assert sum(row["sold"] for row in rows) == 4
+
+def test_frames_are_dropped_when_the_project_is_archived(client, auth, auction):
+    project_id, _, _ = auction
+    client.get(f"/analytics/{project_id}/premiums", headers=auth)
+    client.post(f"/projects/{project_id}/archive", headers=auth)
+    assert wait_for_job(client, auth, project_id)["status"] == "done"
+    assert project_id not in analytics_cache._items
+    assert project_id not in analytics_cache._locks
+
+class SlowCache(ProjectCache[str]):
+    """Loads block until released, per project."""
+
+    max_items = 2
+
+    def __init__(self):
+        super().__init__()
+        self.release = {}
+        self.loads = []
+
+    async def load(self, db, project_id):
+        self.loads.append(project_id)
+        await self.release.setdefault(project_id, asyncio.Event()).wait()
+        return f"project {project_id}"
+
+def test_loads_are_locked_per_project_and_bounded():
+    async def scenario():
+        cache = SlowCache()
+        slow = asyncio.create_task(cache.get(None, 1))
+        duplicate = asyncio.create_task(cache.get(None, 1))
+        await asyncio.sleep(0)
+
+        # Project 2 loads while project 1 is still building
+        cache.release[2] = asyncio.Event()
+        cache.release[2].set()
+        assert await asyncio.wait_for(cache.get(None, 2), 1) == "project 2"
+
+        cache.release[1].set()
+        assert await slow == await duplicate == "project 1"
+        assert cache.loads == [1, 2]
+
+        # Least recently used goes first
+        await cache.get(None, 2)
+        cache.release[3] = asyncio.Event()
+        cache.release[3].set()
+        await cache.get(None, 3)
+        assert list(cache._items) == [2, 3]
+
+    asyncio.run(scenario())
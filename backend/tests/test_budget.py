@@ -0,0 +1,87 @@
+import random
+import shutil
+
+from app import database
+from app.budget import BasePriceTree, BudgetEngine, budget_engines
+
+from conftest import _DB_PATH, create_project, use_replica
+
+def test_cheapest_sum_matches_brute_force():
+    rng = random.Random(7)
+    players = [(player_id, float(rng.randint(1, 50)), rng.random() < 0.7) for player_id in range(1, 60)]
+    tree = BasePriceTree(players)
+    unsold = {player_id: price for player_id, price, is_unsold in players if is_unsold}
+
+    for _ in range(300):
+        player_id = rng.randint(1, 59)
+        if rng.random() < 0.5:
+            changed = tree.set_unsold(player_id, True)
+            assert changed == (player_id not in unsold)
+            unsold[player_id] = players[player_id - 1][1]
+        else:
+            changed = tree.set_unsold(player_id, False)
+            assert changed == (player_id in unsold)
+            unsold.pop(player_id, None)
+
+        prices = sorted(unsold.values())
+        k = rng.randint(0, len(players))
+        assert tree.cheapest_sum(k) == sum(prices[:k])
+        assert tree.unsold == len(prices)
+
+def test_max_bid_keeps_back_cheapest_fillers_excluding_the_lot():
+    engine = BudgetEngine(1, 3, True, [(1, 100.0, True), (2, 5.0, True), (3, 10.0, True), (4, 40.0, True)])
+    # Two more slots to fill after this buy: 5 + 10 held back
+    assert engine.max_bid(1000, 0, 1) == 985
+    # The lot itself is one of the cheap players: fillers are 10 + 40
+    assert engine.max_bid(1000, 0, 2) == 950
+    assert engine.max_bid(1000, 2, 1) == 1000
+    assert engine.max_bid(1000, 3, 1) == 0
+    assert engine.tree.unsold == 4
+
+def test_max_bid_endpoint_and_enforcement(client, auth):
+    project_id, team_ids, player_ids = create_project(
+        client, auth, squad_size=3, enforce_budget_feasibility=True
+    )
+    response = client.get(f"/auction/max-bid/{project_id}?player_id={player_ids[0]}", headers=auth).json()
+    assert response["enforced"] is True
+    assert [team["max_bid"] for team in response["teams"]] == [985, 985]
+
+    rejected = client.post(
+        "/auction/sell", json={"player_id": player_ids[0], "team_id": team_ids[0], "price": 990},
+        headers=auth
+    )
+    assert rejected.status_code == 400
+    assert "Max bid: 985" in rejected.json()["detail"]
+
+    sold = client.post(
+        "/auction/sell", json={"player_id": player_ids[0], "team_id": team_ids[0], "price": 985},
+        headers=auth
+    )
+    assert sold.status_code == 200
+    team = client.get(f"/auction/max-bid/{project_id}", headers=auth).json()["teams"][0]
+    assert team["slots_left"] == 2
+    # 15 left: hold back the cheapest unsold player (5) for the last slot
+    assert team["max_bid"] == 10
+
+def test_enforcement_caches_ignore_a_lagging_replica(client, auth, monkeypatch, tmp_path):
+    project_id, team_ids, player_ids = create_project(client, auth, squad_size=3)
+    stale_copy = tmp_path / "replica.db"
+    shutil.copy(_DB_PATH, stale_copy)
+
+    client.post(
+        "/auction/sell", json={"player_id": player_ids[4], "team_id": team_ids[0], "price": 30},
+        headers=auth
+    )
+    budget_engines.invalidate(project_id)
+    database._recent_writes.clear()
+    database._recent_user_writes.clear()
+
+    read_engine = use_replica(monkeypatch, f"sqlite+aiosqlite:///{stale_copy}")
+    try:
+        response = client.get(f"/auction/max-bid/{project_id}", headers=auth).json()
+        # Team rows come from the lagging replica ...
+        assert response["teams"][0]["players_count"] == 0
+        # ... but the cached engine was built from the primary
+        assert budget_engines._items[project_id].tree.unsold == 5
+    finally:
+        client.portal.call(read_engine.dispose)
@@ -0,0 +1,44 @@
+from conftest import create_project, wait_for_job
+
+def test_clone_copies_teams_and_pool_fresh(client, auth):
+    source, team_ids, player_ids = create_project(client, auth, squad_size=11)
+    client.patch(f"/projects/{source}", json={"own_team_id": team_ids[1]}, headers=auth)
+    client.post(
+        "/auction/sell", json={"player_id": player_ids[0], "team_id": team_ids[1], "price": 300},
+        headers=auth
+    )
+
+    response = client.post(f"/projects/{source}/clone", json={}, headers=auth)
+    assert response.status_code == 200
+    clone = response.json()
+    assert clone["id"] != source
+    assert clone["name"] == "Test (copy)"
+    assert clone["squad_size"] == 11
+
+    teams = client.get(f"/teams/project/{clone['id']}", headers=auth).json()
+    assert [(team["name"], team["remaining_budget"], team["players_count"]) for team in teams] == [
+        ("Team 0", 1000, 0), ("Team 1", 1000, 0)
+    ]
+    # Own team is the copy's "Team 1", not the source's row
+    assert clone["own_team_id"] == teams[1]["id"]
+
+    # The sold player comes back unsold
+    assert client.get(f"/auction/queue/{clone['id']}", headers=auth).json()["remaining"] == len(player_ids)
+
+def test_clone_options_and_archived_sources(client, auth):
+    source, _, _ = create_project(client, auth)
+
+    bare = client.post(
+        f"/projects/{source}/clone",
+        json={"name": "Next season", "include_teams": False, "include_players": False},
+        headers=auth
+    ).json()
+    assert bare["name"] == "Next season"
+    assert client.get(f"/teams/project/{bare['id']}", headers=auth).json() == []
+    assert client.get(f"/auction/queue/{bare['id']}", headers=auth).json()["remaining"] == 0
+
+    client.post(f"/projects/{source}/archive", headers=auth)
+    assert wait_for_job(client, auth, source)["status"] == "done"
+    archived = client.post(f"/projects/{source}/clone", json={}, headers=auth)
+    assert archived.status_code == 400
+    assert archived.json()["detail"] == "Project is archived"
@@ -0,0 +1,46 @@
+from conftest import create_project, signup, wait_for_job
+
+def _sell(client, auth, player_id, team_id, price):
+    response = client.post(
+        "/auction/sell", json={"player_id": player_id, "team_id": team_id, "price": price}, headers=auth
+    )
+    assert response.status_code == 200
+    return response.json()
+
+def _summaries(client, auth):
+    return {summary["id"]: summary for summary in client.get("/projects/dashboard", headers=auth).json()}
+
+def test_dashboard_aggregates_each_project(client, auth):
+    busy, team_ids, player_ids = create_project(client, auth)
+    _sell(client, auth, player_ids[0], team_ids[0], 120)
+    undone = _sell(client, auth, player_ids[1], team_ids[1], 80)
+    _sell(client, auth, player_ids[2], team_ids[1], 30)
+    client.post(f"/auction/undo/{undone['auction_id']}", headers=auth)
+    empty = client.post("/projects/", json={"name": "Empty"}, headers=auth).json()["id"]
+
+    summaries = _summaries(client, auth)
+    assert summaries[busy]["team_count"] == 2
+    assert summaries[busy]["sold_count"] == 2
+    assert summaries[busy]["unsold_count"] == 4
+    assert summaries[busy]["total_spend"] == 150
+    assert summaries[busy]["last_sale_at"] is not None
+    assert summaries[empty] == {**summaries[empty], "team_count": 0, "sold_count": 0, "total_spend": 0}
+
+    other = create_project(client, signup(client, "other@example.com"))[0]
+    assert other not in _summaries(client, auth)
+
+def test_archived_projects_report_snapshot_totals(client, auth):
+    project_id, team_ids, player_ids = create_project(client, auth)
+    _sell(client, auth, player_ids[0], team_ids[0], 120)
+    _sell(client, auth, player_ids[1], team_ids[1], 80)
+    before = _summaries(client, auth)[project_id]
+
+    client.post(f"/projects/{project_id}/archive", headers=auth)
+    assert wait_for_job(client, auth, project_id)["status"] == "done"
+
+    after = _summaries(client, auth)[project_id]
+    assert after["status"] == "archived"
+    for field in ("team_count", "sold_count", "unsold_count", "total_spend"):
+        assert after[field] == before[field]
+    # Taken from the sales in the snapshot
+    assert after["last_sale_at"] is not None
@@ -0,0 +1,40 @@
+import pytest
+
+from app.config import settings
+from app.websocket import CLOSE_SERVICE_RESTART, manager
+
+from conftest import create_project
+
+@pytest.fixture
+def drain_token(monkeypatch):
+    monkeypatch.setattr(settings, "DRAIN_TOKEN", "s3cret")
+    return {"X-Drain-Token": "s3cret"}
+
+def test_drain_is_disabled_without_a_token(client):
+    response = client.post("/admin/drain")
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Drain is disabled: DRAIN_TOKEN is not set"
+    assert not manager.draining
+
+def test_drain_requires_the_matching_token(client, drain_token):
+    for headers in ({}, {"X-Drain-Token": "guess"}):
+        assert client.post("/admin/drain", headers=headers).status_code == 403
+    assert not manager.draining
+
+def test_drain_sends_clients_away(client, auth, drain_token):
+    project_id, _, _ = create_project(client, auth)
+    token = auth["Authorization"].split()[1]
+    with client.websocket_connect(f"/auction/ws/{project_id}?token={token}") as ws:
+        response = client.post("/admin/drain", headers=drain_token)
+        assert response.status_code == 200
+        assert response.json() == {"draining": True, "websockets": 1, "streams": 0}
+
+        message = ws.receive_json()
+        assert message["type"] == "reconnect"
+        assert settings.DRAIN_RECONNECT_MIN_MS <= message["delay_ms"] <= (
+            settings.DRAIN_RECONNECT_MIN_MS + settings.DRAIN_RECONNECT_JITTER_MS
+        )
+        assert ws.receive()["code"] == CLOSE_SERVICE_RESTART
+
+    assert client.get("/health").status_code == 503
+    assert "event: reconnect" in client.get(f"/auction/events/{project_id}?token={token}").text
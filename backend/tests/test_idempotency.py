@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app import database
+from app.idempotency import IdempotencyStore, fingerprint
+from app.models import IdempotencyRecord
+
+from conftest import create_project
+
+def test_sell_replays_the_first_response(client, auth):
+    project_id, team_ids, player_ids = create_project(client, auth)
+    body = {"player_id": player_ids[0], "team_id": team_ids[0], "price": 100}
+    headers = {**auth, "Idempotency-Key": "sale-1"}
+
+    first = client.post("/auction/sell", json=body, headers=headers)
+    retry = client.post("/auction/sell", json=body, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+
+    # Without the key the same request really runs again
+    assert client.post("/auction/sell", json=body, headers=auth).json()["detail"] == "Player already sold"
+
+    conflict = client.post("/auction/sell", json={**body, "price": 101}, headers=headers)
+    assert conflict.status_code == 422
+
+def test_concurrent_duplicates_run_once_and_failures_are_not_recorded():
+    store = IdempotencyStore(max_entries=10, ttl_seconds=60, persist=False)
+    calls = []
+
+    async def execute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"n": len(calls)}
+
+    async def failing():
+        raise HTTPException(status_code=400, detail="nope")
+
+    async def scenario():
+        results = await asyncio.gather(*(store.run(None, "k", "h", execute) for _ in range(5)))
+        assert results == [{"n": 1}] * 5
+
+        with pytest.raises(HTTPException):
+            await store.run(None, "bad", "h", failing)
+        assert await store.run(None, "bad", "h", execute) == {"n": 2}
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+def test_persisted_keys_expire_and_are_pruned(client):
+    store = IdempotencyStore(max_entries=10, ttl_seconds=60, persist=True)
+    calls = []
+
+    async def execute():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    async def run(key):
+        async with database.async_session() as db:
+            response = await store.run(db, key, fingerprint("body"), execute)
+            await db.commit()
+            return response
+
+    async def rows():
+        async with database.async_session() as db:
+            return (await db.execute(select(func.count(IdempotencyRecord.key)))).scalar_one()
+
+    assert client.portal.call(run, "a") == {"n": 1}
+    store._entries.clear()
+    # A restart loses the LRU but not the table
+    assert client.portal.call(run, "a") == {"n": 1}
+
+    store.ttl_seconds = 0
+    store._entries.clear()
+    assert client.portal.call(run, "a") == {"n": 2}
+
+    store._last_prune = 0.0
+    client.portal.call(run, "b")
+    assert client.portal.call(rows) == 1
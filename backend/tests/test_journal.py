@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from app import database
+from app.journal import SaleJournal
+from app.models import Auction, Player, PlayerStatus, Team
+
+from conftest import create_project
+
+def _state(client, project_id):
+    async def load():
+        async with database.async_session() as db:
+            sold = (await db.execute(
+                select(Player.name).where(Player.project_id == project_id, Player.status == PlayerStatus.SOLD)
+            )).scalars().all()
+            budgets = (await db.execute(
+                select(Team.remaining_budget).where(Team.project_id == project_id).order_by(Team.id)
+            )).scalars().all()
+            auctions = (await db.execute(
+                select(func.count(Auction.id)).where(Auction.project_id == project_id)
+            )).scalar_one()
+            return sorted(sold), budgets, auctions
+    return client.portal.call(load)
+
+def _entry(project_id, player_id, team_id, price):
+    return {
+        "project_id": project_id, "player_id": player_id, "team_id": team_id,
+        "price": price, "sold_at": datetime.utcnow().isoformat()
+    }
+
+def test_journaled_sale_is_acked_then_flushed(client, auth, journal):
+    project_id, team_ids, player_ids = create_project(client, auth)
+    response = client.post(
+        "/auction/sell", json={"player_id": player_ids[0], "team_id": team_ids[0], "price": 100},
+        headers=auth
+    ).json()
+    assert response["auction_id"] is None
+    assert response["journal_seq"] == 1
+
+    again = client.post(
+        "/auction/sell", json={"player_id": player_ids[0], "team_id": team_ids[1], "price": 100},
+        headers=auth
+    )
+    assert again.json()["detail"] == "Player already sold"
+
+    # Reads flush the project's journaled sales first
+    live = client.get(f"/auction/live-data/{project_id}", headers=auth).json()
+    assert [sale["price"] for sale in live["recent_sales"]] == [100]
+    assert _state(client, project_id) == (["A"], [900, 1000], 1)
+
+def test_recovery_replays_unflushed_sales_and_continues_the_sequence(client, auth, tmp_path):
+    project_id, team_ids, player_ids = create_project(client, auth)
+    path = str(tmp_path / "journal.log")
+
+    def journal():
+        # Flush interval and batch size beyond the test: only recovery applies sales
+        return SaleJournal(path, fsync_interval=0, flush_interval=3600, flush_batch_size=100)
+
+    async def crash_after_appends():
+        first = journal()
+        await first.start()
+        await first.append(_entry(project_id, player_ids[0], team_ids[0], 100))
+        await first.append(_entry(project_id, player_ids[1], team_ids[1], 50))
+        # Apply the first sale, as the flusher would have before the crash
+        await first._apply([first._unflushed[0]])
+        # Crash: no flush, no checkpoint, and a torn final write
+        for task in first._tasks:
+            task.cancel()
+        await asyncio.gather(*first._tasks, return_exceptions=True)
+        first._file.write(b'{"seq": 3, "proj')
+        first._file.close()
+
+    client.portal.call(crash_after_appends)
+    assert _state(client, project_id) == (["A"], [900, 1000], 1)
+
+    async def restart_and_append():
+        second = journal()
+        await second.start()
+        try:
+            entry = await second.append(_entry(project_id, player_ids[2], team_ids[0], 20))
+            return entry["seq"]
+        finally:
+            await second.close()
+
+    # A is not applied twice, B is replayed and the torn entry is dropped
+    assert client.portal.call(restart_and_append) == 3
+    assert _state(client, project_id) == (["A", "B", "C"], [880, 950], 3)
+    with open(path + ".checkpoint") as f:
+        assert f.read() == "3"
@@ -0,0 +1,93 @@
+from sqlalchemy import event, func, select
+
+from app import database
+from app.lifecycle import lifecycle
+from app.models import Auction, Player, Team
+
+from conftest import create_project, wait_for_job
+
+def _count(client, model, project_id):
+    async def count():
+        async with database.async_session() as db:
+            result = await db.execute(select(func.count(model.id)).where(model.project_id == project_id))
+            return result.scalar_one()
+    return client.portal.call(count)
+
+def _sell(client, auth, player_id, team_id, price=10):
+    return client.post(
+        "/auction/sell", json={"player_id": player_id, "team_id": team_id, "price": price}, headers=auth
+    )
+
+def test_delete_removes_the_project_and_its_rows(client, auth, monkeypatch):
+    # Several chunks per table
+    monkeypatch.setattr("app.lifecycle.DELETE_CHUNK_SIZE", 2)
+    project_id, team_ids, player_ids = create_project(client, auth)
+    _sell(client, auth, player_ids[0], team_ids[0])
+
+    response = client.delete(f"/projects/{project_id}", headers=auth)
+    assert response.status_code == 202
+    job = wait_for_job(client, auth, project_id)
+    assert job["status"] == "done"
+    assert job["progress"]["players"] == {"deleted": 6, "total": 6}
+
+    assert client.get("/projects/", headers=auth).json() == []
+    for model in (Player, Team, Auction):
+        assert _count(client, model, project_id) == 0
+    assert project_id not in lifecycle.statuses
+
+def test_archive_keeps_a_snapshot_and_blocks_writes(client, auth):
+    project_id, team_ids, player_ids = create_project(client, auth)
+    _sell(client, auth, player_ids[0], team_ids[0], 120)
+
+    client.post(f"/projects/{project_id}/archive", headers=auth)
+    assert wait_for_job(client, auth, project_id)["status"] == "done"
+
+    snapshot = client.get(f"/projects/{project_id}/archive", headers=auth).json()
+    assert [sale["price"] for sale in snapshot["sales"]] == [120]
+    assert snapshot["unsold_players"] == 5
+    assert _count(client, Player, project_id) == 0
+
+    team = client.post("/teams/", json={"name": "Late", "project_id": project_id}, headers=auth)
+    assert team.json()["detail"] == "Project is archived"
+    again = client.post(f"/projects/{project_id}/archive", headers=auth)
+    assert again.json()["detail"] == "Project is already archived"
+
+def test_status_cannot_be_patched(client, auth):
+    project_id, team_ids, _ = create_project(client, auth)
+
+    response = client.patch(f"/projects/{project_id}", json={"status": "archived"}, headers=auth)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cannot update: status"
+
+    response = client.patch(f"/projects/{project_id}", json={"own_team_id": team_ids[1]}, headers=auth)
+    assert response.json()["own_team_id"] == team_ids[1]
+    assert response.json()["status"] == "active"
+
+def test_updates_are_rejected_while_a_project_is_cleared(client, auth):
+    project_id, _, _ = create_project(client, auth)
+    client.post(f"/projects/{project_id}/archive", headers=auth)
+    wait_for_job(client, auth, project_id)
+
+    response = client.patch(f"/projects/{project_id}", json={"name": "Renamed"}, headers=auth)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Project is archived"
+
+def test_journaled_sales_check_lifecycle_state_in_memory(client, auth, journal):
+    project_id, team_ids, player_ids = create_project(client, auth)
+    assert _sell(client, auth, player_ids[0], team_ids[0]).status_code == 200
+
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(database.engine.sync_engine, "before_cursor_execute", record)
+    try:
+        assert _sell(client, auth, player_ids[1], team_ids[0]).status_code == 200
+        # Simulate a job that has just marked the project
+        lifecycle.statuses[project_id] = "archiving"
+        rejected = _sell(client, auth, player_ids[2], team_ids[0])
+    finally:
+        event.remove(database.engine.sync_engine, "before_cursor_execute", record)
+
+    assert rejected.status_code == 400
+    assert rejected.json()["detail"] == "Project is archiving"
+    assert not [statement for statement in statements if "projects" in statement]
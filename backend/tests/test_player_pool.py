@@ -0,0 +1,69 @@
+from app.player_pool import PlayerPoolIndex
+from app.records import PlayerRecord
+
+from conftest import create_project
+
+def _record(player_id, name, category, role, points, base_price=10.0):
+    return PlayerRecord(player_id, 1, name, base_price, category, role, points, False)
+
+def _pool():
+    pool = PlayerPoolIndex(1)
+    for record in [
+        _record(1, "A", "Gold", "BAT", 50),
+        _record(2, "B", "Gold", "WK", 70),
+        _record(3, "C", "Silver", "BWL", 10),
+        _record(4, "D", "Silver", "AR", None),
+        _record(5, "E", "Platinum", "WK", 90),
+        _record(6, "F", None, None, None),
+        _record(7, "G", "Gold", "BAT", 50, base_price=20.0),
+    ]:
+        pool.add(record)
+    return pool
+
+def _names(players):
+    return [player.name for player in players]
+
+def test_queue_orders_tiers_then_points_then_base_price():
+    pool = _pool()
+    assert _names(pool.queue()) == ["C", "D", "E", "B", "G", "A", "F"]
+    assert _names(pool.queue(category="Gold")) == ["B", "G", "A"]
+    assert _names(pool.queue(role="WK")) == ["E", "B"]
+    assert _names(pool.queue(limit=2)) == ["C", "D"]
+
+def test_next_lot_follows_removals_and_re_adds():
+    pool = _pool()
+    assert pool.next_lot().name == "C"
+    assert pool.remove(3)
+    assert not pool.remove(3)
+    assert pool.next_lot().name == "D"
+    pool.remove(4)
+    assert pool.next_lot().name == "E"
+    assert pool.next_lot(category="Gold", role="BAT").name == "G"
+    assert pool.next_lot(category="Bronze") is None
+
+    pool.add(_record(3, "C", "Silver", "BWL", 10))
+    assert pool.next_lot().name == "C"
+    assert len(pool) == 6
+
+def test_random_lot_stays_in_best_matching_tier():
+    pool = _pool()
+    for _ in range(20):
+        assert pool.random_lot(category="Gold").name in {"A", "B", "G"}
+        assert pool.random_lot().name in {"C", "D"}
+
+def test_next_lot_endpoint_tracks_sales_and_undo(client, auth):
+    project_id, team_ids, player_ids = create_project(client, auth)
+    assert client.get(f"/auction/next-lot/{project_id}", headers=auth).json()["player"]["name"] == "C"
+
+    sale = client.post(
+        "/auction/sell", json={"player_id": player_ids[2], "team_id": team_ids[0], "price": 20},
+        headers=auth
+    ).json()
+    response = client.get(f"/auction/next-lot/{project_id}", headers=auth).json()
+    assert response["player"]["name"] == "D"
+    assert response["remaining"] == 5
+
+    client.post(f"/auction/undo/{sale['auction_id']}", headers=auth)
+    queue = client.get(f"/auction/queue/{project_id}?limit=3", headers=auth).json()
+    assert [player["name"] for player in queue["players"]] == ["C", "D", "E"]
+    assert queue["remaining"] == 6
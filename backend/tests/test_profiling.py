@@ -0,0 +1,55 @@
+import fastapi.routing
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database, profiling
+from app.config import settings
+from app.models import User
+
+class Row(BaseModel):
+    n: int
+    label: str
+
+def _profiled_app():
+    router = APIRouter(route_class=profiling.ProfiledRoute)
+
+    @router.get("/rows", response_model=list[Row])
+    async def rows():
+        async with database.async_session() as db:
+            await db.execute(select(User.id))
+            await db.commit()
+        return [{"n": n, "label": str(n) * 20} for n in range(20000)]
+
+    @router.get("/sync")
+    def sync_rows():
+        return {"rows": list(range(100))}
+
+    app = FastAPI()
+    app.include_router(router)
+    profiling.install(app)
+    return app
+
+def test_sampled_requests_split_sql_orm_and_encode(client, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(profiling, "profiles", profiling.ProfileStore(10))
+    serialize_response = fastapi.routing.serialize_response
+
+    with TestClient(_profiled_app()) as profiled:
+        assert len(profiled.get("/rows").json()) == 20000
+        assert profiled.get("/sync").json()["rows"][-1] == 99
+
+    by_path = {profile.path: profile.to_dict() for profile in profiling.profiles.slowest()}
+    rows = by_path["/rows"]
+    assert rows["status"] == 200 and rows["trigger"] == "sample"
+    assert rows["sql_queries"] >= 1 and rows["sql_ms"] > 0
+    assert rows["orm_ms"] > 0
+    # Validating and rendering 20k rows dominates the request
+    assert rows["encode_ms"] > rows["sql_ms"]
+    assert by_path["/sync"]["encode_ms"] > 0
+
+    # Nothing in FastAPI or the session factories is swapped out
+    assert fastapi.routing.serialize_response is serialize_response
+    assert database.async_session.class_ is AsyncSession
@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import event
+
+from app import database
+
+from conftest import create_project, use_replica
+
+@pytest.fixture
+def replica(client, monkeypatch):
+    """A second engine on the same database, standing in for a replica,
+    with connection checkouts counted on both engines."""
+    read_engine = use_replica(monkeypatch)
+
+    checkouts = {"primary": 0, "replica": 0}
+    def counter(name):
+        def count(*args):
+            checkouts[name] += 1
+        return count
+    listeners = [
+        (database.engine.sync_engine.pool, counter("primary")),
+        (read_engine.sync_engine.pool, counter("replica")),
+    ]
+    for pool, listener in listeners:
+        event.listen(pool, "checkout", listener)
+    yield checkouts
+    for pool, listener in listeners:
+        event.remove(pool, "checkout", listener)
+    client.portal.call(read_engine.dispose)
+
+def reset(checkouts):
+    checkouts.update(primary=0, replica=0)
+
+def test_read_endpoints_use_only_the_replica(client, auth, replica):
+    project_id, _, _ = create_project(client, auth)
+    database._recent_writes.clear()
+    database._recent_user_writes.clear()
+
+    reset(replica)
+    response = client.get(f"/auction/live-data/{project_id}", headers=auth)
+    assert len(response.json()["unsold_players"]) == 6
+    # User lookup included: nothing is read from the primary
+    assert replica == {"primary": 0, "replica": 1}
+
+    reset(replica)
+    response = client.get("/projects/", headers=auth)
+    assert [project["id"] for project in response.json()] == [project_id]
+    assert replica == {"primary": 0, "replica": 1}
+
+def test_writes_pin_reads_to_the_primary(client, auth, replica):
+    project_id, _, _ = create_project(client, auth)
+
+    reset(replica)
+    assert client.get(f"/teams/project/{project_id}", headers=auth).status_code == 200
+    assert replica == {"primary": 1, "replica": 0}
+
+    database._recent_writes.clear()
+    database._recent_user_writes.clear()
+    reset(replica)
+    assert client.get(f"/teams/project/{project_id}", headers=auth).status_code == 200
+    assert replica == {"primary": 0, "replica": 1}
+
+    reset(replica)
+    client.get(f"/teams/project/{project_id}", headers={**auth, "X-Read-Primary": "1"})
+    assert replica == {"primary": 1, "replica": 0}
+
+def test_new_project_is_listed_right_after_creation(client, auth, replica):
+    database._recent_user_writes.clear()
+    client.post("/projects/", json={"name": "Fresh"}, headers=auth)
+
+    reset(replica)
+    response = client.get("/projects/", headers=auth)
+    assert [project["name"] for project in response.json()] == ["Fresh"]
+    assert replica == {"primary": 1, "replica": 0}
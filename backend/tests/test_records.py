@@ -0,0 +1,55 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import PlayerRole, PlayerStatus
+from app.records import PlayerRecord, SaleRecord, TeamRecord, json_default
+
+from conftest import create_project
+
+def _player_row(**fields):
+    row = dict(
+        id=1, project_id=2, name="A", base_price=None, category="Gold",
+        role=PlayerRole.BAT, points=50, status=PlayerStatus.SOLD
+    )
+    return SimpleNamespace(**{**row, **fields})
+
+def test_records_are_slotted_and_encode_directly():
+    player = PlayerRecord.from_row(_player_row())
+    team = TeamRecord.from_row(SimpleNamespace(id=3, name="Team 0", remaining_budget=900.0, players_count=None))
+
+    assert (player.base_price, player.role, player.sold) == (0.0, "BAT", True)
+    assert team.players_count == 0
+    for record in (player, team, SaleRecord(player, team, 100)):
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.extra = 1
+
+    encoded = json.loads(json.dumps({"lot": player, "team": team}, default=json_default))
+    assert encoded["lot"] == {
+        "id": 1, "name": "A", "base_price": 0.0, "category": "Gold", "role": "BAT", "points": 50
+    }
+    assert encoded["team"] == {"id": 3, "remaining_budget": 900.0, "players_count": 0}
+
+    with pytest.raises(TypeError):
+        json.dumps({"when": object()}, default=json_default)
+
+def test_sale_record_includes_journal_seq_only_when_journaled():
+    player = PlayerRecord.from_row(_player_row(role=None, status=PlayerStatus.UNSOLD))
+    team = TeamRecord(3, "Team 0", 900.0, 1)
+
+    committed = SaleRecord(player, team, 100, auction_id=7).to_dict()
+    assert committed["auction_id"] == 7 and "journal_seq" not in committed
+    assert committed["player"] == {
+        "id": 1, "name": "A", "sold_price": 100, "category": "Gold", "role": None,
+        "points": 50, "team_id": 3, "team_name": "Team 0"
+    }
+
+    journaled = SaleRecord(player, team, 100, journal_seq=4).to_dict()
+    assert journaled["auction_id"] is None and journaled["journal_seq"] == 4
+
+def test_next_lot_is_served_from_records(client, auth):
+    project_id, _, _ = create_project(client, auth)
+    lot = client.get(f"/auction/next-lot/{project_id}", headers=auth).json()
+    assert set(lot["player"]) == {"id", "name", "base_price", "category", "role", "points"}
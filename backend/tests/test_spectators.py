@@ -0,0 +1,80 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+from app.config import settings
+from app.websocket import CLOSE_TRY_AGAIN_LATER, ConnectionManager
+
+from conftest import FakeSocket, create_project
+
+def test_spectators_receive_sales_with_a_view_token(client, auth):
+    project_id, team_ids, player_ids = create_project(client, auth)
+    view_token = client.post(f"/auction/view-token/{project_id}", headers=auth).json()["view_token"]
+
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect(f"/auction/spectate/{project_id + 1}?vt={view_token}") as ws:
+            ws.receive_json()
+    assert closed.value.code == 4001
+
+    with client.websocket_connect(f"/auction/spectate/{project_id}?vt={view_token}") as ws:
+        client.post(
+            "/auction/sell", json={"player_id": player_ids[0], "team_id": team_ids[0], "price": 100},
+            headers=auth
+        )
+        message = ws.receive_json()
+    assert message["type"] == "player_sold"
+    assert message["data"]["player"]["name"] == "A"
+    assert message["seq"] == 1
+
+def test_broadcast_returns_before_slow_sockets_are_sent_to():
+    async def scenario():
+        manager = ConnectionManager()
+        slow, fast = FakeSocket(send_delay=0.2), FakeSocket()
+        await manager.connect(slow, 1, spectator=True)
+        await manager.connect(fast, 1)
+
+        started = time.perf_counter()
+        await manager.broadcast_to_project(1, {"type": "player_sold", "data": {}})
+        await manager.broadcast_to_project(1, {"type": "undo", "auction_id": 7})
+        queued_in = time.perf_counter() - started
+
+        await manager.flush()
+        return queued_in, slow, fast, manager
+
+    queued_in, slow, fast, manager = asyncio.run(scenario())
+    assert queued_in < 0.05
+    for socket in (slow, fast):
+        assert [json.loads(text)["seq"] for text in socket.sent] == [1, 2]
+    assert manager.deliveries == {} and manager.outbox == {}
+
+def test_failed_sends_evict_the_socket():
+    async def scenario():
+        manager = ConnectionManager()
+        healthy, broken = FakeSocket(), FakeSocket(broken=True)
+        await manager.connect(healthy, 1, spectator=True)
+        await manager.connect(broken, 1, spectator=True)
+        await manager.broadcast_to_project(1, {"type": "undo", "auction_id": 1})
+        await manager.flush()
+        return manager, healthy, broken
+
+    manager, healthy, broken = asyncio.run(scenario())
+    assert broken.closed == CLOSE_TRY_AGAIN_LATER
+    assert healthy.closed is None and len(healthy.sent) == 1
+    assert manager.spectators == {1: {healthy}}
+    assert manager.spectator_count == 1
+
+def test_spectators_are_capped_per_project_and_globally(monkeypatch):
+    monkeypatch.setattr(settings, "WS_MAX_SPECTATORS_PER_PROJECT", 2)
+    monkeypatch.setattr(settings, "WS_MAX_SPECTATORS", 3)
+
+    async def scenario():
+        manager = ConnectionManager()
+        return [
+            await manager.connect(FakeSocket(), project_id, spectator=True)
+            for project_id in (1, 1, 1, 2, 3)
+        ]
+
+    assert asyncio.run(scenario()) == [True, True, False, True, False]
@@ -0,0 +1,73 @@
+import pytest
+
+from app.budget import budget_engines
+from app.player_pool import player_pool
+from app.project_cache import ProjectCache
+from app.squad_rules import SquadRuleEngine, squad_rules
+
+from conftest import create_project, wait_for_job
+
+RULES = {"min_roles": {"WK": 1}, "max_roles": {"BAT": 1}, "max_categories": {"gold": 2}}
+
+def test_rule_engine_checks_limits_and_minimums():
+    engine = SquadRuleEngine(1, 3, RULES)
+    assert engine.check(10, "BAT", "Gold") is None
+    engine.record(10, "BAT", "Gold")
+    assert engine.check(10, "bat", "Silver") == "Role limit reached for BAT. Max: 1"
+
+    engine.record(10, "BWL", "Gold")
+    assert engine.check(10, "WK", "gold") == "Category limit reached for gold. Max: 2"
+    assert engine.check(10, "AR", "Silver").startswith("Squad could no longer meet role minimums")
+    assert engine.check(10, "WK", "Silver") is None
+
+    engine.record(10, "WK", "Silver")
+    assert engine.check(10, "AR", None) == "Squad full. Max squad size: 3"
+
+    engine.record(10, "WK", "Silver", -1)
+    assert engine.check(10, "WK", "Silver") is None
+    # Other teams have their own counters
+    assert engine.check(11, "BAT", "Gold") is None
+
+def test_sell_enforces_squad_rules_and_undo_releases_them(client, auth):
+    project_id, team_ids, player_ids = create_project(client, auth, squad_size=3, squad_rules=RULES)
+    sell = lambda player, team=team_ids[0]: client.post(
+        "/auction/sell", json={"player_id": player_ids[player], "team_id": team, "price": 10},
+        headers=auth
+    )
+    first = sell(0)
+    assert first.status_code == 200
+
+    # After A and C, buying D would leave no slot for the required WK
+    assert sell(2).status_code == 200
+    rejected = sell(3)
+    assert rejected.status_code == 400
+    assert "role minimums" in rejected.json()["detail"]
+    assert sell(3, team_ids[1]).status_code == 200
+
+    client.post(f"/auction/undo/{first.json()['auction_id']}", headers=auth)
+    assert sell(1).status_code == 200
+
+def test_project_cache_requires_load():
+    class Incomplete(ProjectCache[int]):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_caches_are_evicted_when_a_project_is_deleted(client, auth):
+    project_id, team_ids, player_ids = create_project(client, auth, squad_size=3)
+    client.get(f"/auction/max-bid/{project_id}", headers=auth)
+    client.get(f"/auction/queue/{project_id}", headers=auth)
+    client.post(
+        "/auction/sell", json={"player_id": player_ids[0], "team_id": team_ids[0], "price": 10},
+        headers=auth
+    )
+    assert project_id in budget_engines._items
+    assert project_id in squad_rules._generations
+
+    client.delete(f"/projects/{project_id}", headers=auth)
+    assert wait_for_job(client, auth, project_id)["status"] == "done"
+
+    for cache in (player_pool, budget_engines, squad_rules):
+        assert project_id not in cache._items
+        assert project_id not in cache._generations
@@ -0,0 +1,94 @@
+import asyncio
+
+from app.config import settings
+from app.websocket import ConnectionManager
+
+from conftest import FakeSocket, create_project
+
+def _sold(manager, project_id, count):
+    for _ in range(count):
+        manager._broadcast(project_id, {"type": "player_sold", "data": {}})
+
+def _field(frames, name):
+    return [
+        line for frame in frames for line in frame.decode().split("\n")
+        if line.startswith(name + ": ")
+    ]
+
+def _ids(frames):
+    return _field(frames, "id")
+
+def _events(frames):
+    return _field(frames, "event")
+
+def test_resume_replays_what_the_client_missed(monkeypatch):
+    monkeypatch.setattr(settings, "SSE_REPLAY_BUFFER", 3)
+
+    async def scenario():
+        manager = ConnectionManager()
+        _sold(manager, 1, 2)
+        _, backlog = manager.subscribe(1, f"{manager.epoch}-1")
+        assert _ids(backlog) == [f"id: {manager.epoch}-2"]
+
+        _, current = manager.subscribe(1, f"{manager.epoch}-2")
+        assert current == []
+
+        # Seq 1 and 2 have left the buffer: the client must refetch
+        _sold(manager, 1, 3)
+        _, expired = manager.subscribe(1, f"{manager.epoch}-1")
+        assert _events(expired) == ["event: reset"]
+        assert _ids(expired) == [f"id: {manager.epoch}-5"]
+
+    asyncio.run(scenario())
+
+def test_ids_from_another_boot_get_a_reset():
+    async def scenario():
+        before, after = ConnectionManager(), ConnectionManager()
+        _sold(before, 1, 5)
+        _sold(after, 1, 5)
+        assert before.epoch != after.epoch
+
+        for last_event_id in (f"{before.epoch}-3", "3", f"{after.epoch}-x"):
+            _, backlog = after.subscribe(1, last_event_id)
+            assert _events(backlog) == ["event: reset"]
+
+    asyncio.run(scenario())
+
+def test_streams_share_the_socket_caps(monkeypatch):
+    monkeypatch.setattr(settings, "WS_MAX_CONNECTIONS_PER_PROJECT", 2)
+    monkeypatch.setattr(settings, "WS_MAX_CONNECTIONS", 3)
+
+    async def scenario():
+        manager = ConnectionManager()
+        assert await manager.connect(FakeSocket(), 1)
+        stream = manager.stream(1)
+        first = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0)
+        _sold(manager, 1, 1)
+        assert _events([await first]) == ["event: player_sold"]
+        assert manager.connection_count == 2
+
+        # Project 1 is full for both sockets and streams
+        assert not await manager.connect(FakeSocket(), 1)
+        refused = [frame async for frame in manager.stream(1)]
+        assert _events(refused) == ["event: reconnect"]
+        assert refused[0].startswith(b"retry: ")
+
+        # Server-wide cap counts the stream too
+        assert await manager.connect(FakeSocket(), 2)
+        assert manager.connection_count == 3
+        assert _events([frame async for frame in manager.stream(3)]) == ["event: reconnect"]
+
+        await stream.aclose()
+        assert manager.connection_count == 2 and manager.streams == {}
+
+    asyncio.run(scenario())
+
+def test_endpoint_sends_spectators_away_when_full(client, auth, monkeypatch):
+    project_id, _, _ = create_project(client, auth)
+    view_token = client.post(f"/auction/view-token/{project_id}", headers=auth).json()["view_token"]
+    monkeypatch.setattr(settings, "WS_MAX_SPECTATORS_PER_PROJECT", 0)
+
+    response = client.get(f"/auction/events/{project_id}?vt={view_token}")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: reconnect" in response.text
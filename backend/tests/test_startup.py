@@ -0,0 +1,46 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.startup import BACKEND_DIR, _alembic_head, check_schema_at_head
+
+def test_heavy_modules_are_not_imported_at_startup():
+    code = "import sys, app.main; print(sorted({'pandas', 'numpy', 'alembic'} & set(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=os.environ,
+        capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+def test_health_reports_startup_phases(client):
+    client.get("/")
+    startup = client.get("/health").json()["startup"]
+    assert {"imports", "schema"} <= set(startup["phases"])
+    assert startup["first_request_after"] is not None
+
+def _check_schema(tmp_path, version=None):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/schema.db")
+
+    async def check():
+        try:
+            async with engine.begin() as conn:
+                if version is not None:
+                    await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32))"))
+                    await conn.execute(text("INSERT INTO alembic_version VALUES (:v)"), {"v": version})
+                await check_schema_at_head(conn)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(check())
+
+def test_schema_check_rejects_unmigrated_database(tmp_path):
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        _check_schema(tmp_path)
+
+def test_schema_check_accepts_database_at_head(tmp_path):
+    _check_schema(tmp_path, _alembic_head())
@@ -0,0 +1,35 @@
+from conftest import create_project, signup
+
+def _bulk(client, auth, **body):
+    return client.post("/teams/bulk", json=body, headers=auth)
+
+def test_bulk_tops_the_project_up_to_total_teams(client, auth):
+    project_id, _, _ = create_project(client, auth, teams=1, players=(), total_teams=4)
+
+    response = _bulk(client, auth, project_id=project_id, initial_budget=500)
+    assert response.status_code == 200
+    created = response.json()
+    assert [team["name"] for team in created] == ["Team 2", "Team 3", "Team 4"]
+    assert {team["remaining_budget"] for team in created} == {500}
+
+    teams = client.get(f"/teams/project/{project_id}", headers=auth).json()
+    colors = [team["color"].upper() for team in teams]
+    assert len(teams) == 4 and len(set(colors)) == 4
+
+    full = _bulk(client, auth, project_id=project_id)
+    assert full.status_code == 400
+    assert full.json()["detail"] == "No teams to create"
+
+def test_bulk_count_and_cloned_teams(client, auth):
+    source, _, _ = create_project(client, auth, teams=3, players=())
+    target, _, _ = create_project(client, auth, teams=0, players=(), total_teams=8)
+
+    cloned = _bulk(client, auth, project_id=target, clone_from_project_id=source, count=2).json()
+    assert [(team["name"], team["initial_budget"]) for team in cloned] == [("Team 0", 1000), ("Team 1", 1000)]
+
+    extra = _bulk(client, auth, project_id=target, count=1, name_prefix="Side").json()
+    assert [team["name"] for team in extra] == ["Side 3"]
+
+    stranger = signup(client, "other@example.com")
+    assert _bulk(client, stranger, project_id=target, count=1).status_code == 404
+    assert _bulk(client, auth, project_id=target, clone_from_project_id=source + 100).status_code == 404
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+from app.config import settings
+from app.websocket import CLOSE_IDLE_TIMEOUT, CLOSE_TRY_AGAIN_LATER, ConnectionManager
+
+from conftest import FakeSocket
+
+@pytest.fixture
+def fast_heartbeats(monkeypatch):
+    monkeypatch.setattr(settings, "WS_HEARTBEAT_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "WS_IDLE_TIMEOUT_SECONDS", 0.05)
+
+def test_silent_sockets_are_pinged_then_evicted(fast_heartbeats):
+    async def scenario():
+        manager = ConnectionManager()
+        socket = FakeSocket()
+        await asyncio.wait_for(manager.serve(socket, 1), 1)
+        return manager, socket
+
+    manager, socket = asyncio.run(scenario())
+    assert socket.closed == CLOSE_IDLE_TIMEOUT
+    assert "ping" in socket.types()
+    assert manager.active_connections == {}
+    assert manager.connection_count == 0
+
+def test_clients_that_answer_stay_connected(fast_heartbeats):
+    async def scenario():
+        manager = ConnectionManager()
+        socket = FakeSocket()
+        serving = asyncio.create_task(manager.serve(socket, 1))
+        for _ in range(10):
+            await asyncio.sleep(0.02)
+            socket.incoming.put_nowait("ping")
+        assert socket.closed is None
+        assert manager.connection_count == 1
+        socket.incoming.put_nowait(None)
+        await serving
+        return manager, socket
+
+    manager, socket = asyncio.run(scenario())
+    assert "pong" in socket.types()
+    assert manager.connection_count == 0
+
+def test_connections_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "WS_MAX_CONNECTIONS_PER_PROJECT", 2)
+    monkeypatch.setattr(settings, "WS_MAX_CONNECTIONS", 3)
+
+    async def scenario():
+        manager = ConnectionManager()
+        sockets = [FakeSocket() for _ in range(5)]
+        accepted = [
+            await manager.connect(sockets[0], 1),
+            await manager.connect(sockets[1], 1),
+            await manager.connect(sockets[2], 1),  # project full
+            await manager.connect(sockets[3], 2),
+            await manager.connect(sockets[4], 3),  # server full
+        ]
+        return manager, sockets, accepted
+
+    manager, sockets, accepted = asyncio.run(scenario())
+    assert accepted == [True, True, False, True, False]
+    assert [socket.closed for socket in sockets] == [None, None, CLOSE_TRY_AGAIN_LATER, None, CLOSE_TRY_AGAIN_LATER]
+    assert manager.connection_count == 3
+
+def test_websocket_endpoint_requires_a_valid_token(client, auth):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/auction/ws/1?token=bogus") as ws:
+            ws.receive_json()
+    assert closed.value.code == 4001
+
+    token = auth["Authorization"].split()[1]
+    with client.websocket_connect(f"/auction/ws/1?token={token}") as ws:
+        ws.send_text("ping")
+        assert ws.receive_json()["type"] == "pong"
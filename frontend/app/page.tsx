@@ -4,11 +4,11 @@ import { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import Link from 'next/link';
 import api from '@/lib/api';
-import { Project } from '@/types';
+import { ProjectSummary } from '@/types';
 import DarkModeToggle from '@/components/DarkModeToggle';
 
 export default function Dashboard() {
-  const [projects, setProjects] = useState<Project[]>([]);
+  const [projects, setProjects] = useState<ProjectSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [deleting, setDeleting] = useState<number | null>(null);
   const router = useRouter();
@@ -24,7 +24,7 @@ export default function Dashboard() {
   }, [router]);
 
   const loadProjects = () => {
-    api.get('/projects')
+    api.get('/projects/dashboard')
       .then(response => {
         setProjects(response.data);
         setLoading(false);
@@ -91,7 +91,9 @@ export default function Dashboard() {
               <Link href={`/auction/${project.id}`}>
                 <h3 className="text-lg font-bold mb-2 hover:text-blue-400">{project.name}</h3>
               </Link>
-              <p style={{ color: 'var(--text-secondary)' }}>Teams: {project.total_teams}</p>
+              <p style={{ color: 'var(--text-secondary)' }}>Teams: {project.team_count} / {project.total_teams}</p>
+              <p style={{ color: 'var(--text-secondary)' }}>Sold: {project.sold_count} | Unsold: {project.unsold_count}</p>
+              <p style={{ color: 'var(--text-secondary)' }}>Total spend: ₹{project.total_spend.toLocaleString()}</p>
               <p style={{ color: 'var(--text-secondary)' }}>Status: {project.status}</p>
               
               <div className="mt-4 flex gap-2">
@@ -4,11 +4,22 @@ import { useEffect, useRef, useState } from 'react';
 import { useQueryClient } from '@tanstack/react-query';
 
 interface WebSocketMessage {
-  type: 'auction_update' | 'player_sold' | 'undo' | 'ping';
+  type: 'auction_update' | 'player_sold' | 'undo' | 'ping' | 'pong' | 'reconnect';
   data?: any;
   auction_id?: number;
+  seq?: number;
+  delay_ms?: number;
+  last_seq?: number;
 }
 
+// Close code sent when the server restarts (e.g. during a rolling deploy)
+const CLOSE_SERVICE_RESTART = 1012;
+// Close code sent when we fell behind on updates or the server is full
+const CLOSE_TRY_AGAIN_LATER = 1013;
+
+// Spread reconnects when the server did not suggest a delay
+const fallbackDelay = () => 1000 + Math.random() * 15000;
+
 export function useAuctionSocket(projectId: number) {
   const ws = useRef<WebSocket | null>(null);
   const queryClient = useQueryClient();
@@ -20,32 +31,64 @@ export function useAuctionSocket(projectId: number) {
     const token = localStorage.getItem('token');
     if (!token) return;
 
-    const wsUrl = `ws://localhost:8000/auction/ws/${projectId}?token=${token}`;
-    ws.current = new WebSocket(wsUrl);
+    let closedByUs = false;
+    let reconnectDelay: number | null = null;
+    let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
 
-    ws.current.onopen = () => {
-      setIsConnected(true);
-    };
-
-    ws.current.onclose = () => {
-      setIsConnected(false);
-    };
+    const connect = (isReconnect: boolean) => {
+      const wsUrl = `ws://localhost:8000/auction/ws/${projectId}?token=${token}`;
+      ws.current = new WebSocket(wsUrl);
 
-    ws.current.onmessage = (event) => {
-      const message: WebSocketMessage = JSON.parse(event.data);
-      
-      switch (message.type) {
-        case 'player_sold':
-        case 'undo':
+      ws.current.onopen = () => {
+        setIsConnected(true);
+        if (isReconnect) {
+          // Events may have been missed while away
           queryClient.invalidateQueries({ queryKey: ['auction-data', projectId] });
-          break;
-      }
+        }
+      };
+
+      ws.current.onclose = (event) => {
+        setIsConnected(false);
+        if (closedByUs) return;
+        if (
+          reconnectDelay !== null ||
+          event.code === CLOSE_SERVICE_RESTART ||
+          event.code === CLOSE_TRY_AGAIN_LATER
+        ) {
+          const delay = reconnectDelay ?? fallbackDelay();
+          reconnectDelay = null;
+          reconnectTimer = setTimeout(() => connect(true), delay);
+        }
+      };
+
+      ws.current.onmessage = (event) => {
+        const message: WebSocketMessage = JSON.parse(event.data);
+        
+        switch (message.type) {
+          case 'ping':
+            // Answer server heartbeats so the connection is not evicted as idle
+            ws.current?.send('pong');
+            break;
+          case 'reconnect':
+            // Server is draining; come back after its jittered delay
+            reconnectDelay = message.delay_ms ?? fallbackDelay();
+            break;
+          case 'player_sold':
+          case 'undo':
+            queryClient.invalidateQueries({ queryKey: ['auction-data', projectId] });
+            break;
+        }
+      };
     };
 
+    connect(false);
+
     return () => {
+      closedByUs = true;
+      clearTimeout(reconnectTimer);
       ws.current?.close();
     };
   }, [projectId, queryClient]);
 
   return { isConnected };
-}
\ No newline at end of file
+}
@@ -40,4 +40,17 @@ export interface Project {
   own_team_id?: number;
   status: string;
   created_at: string;
+}
+
+export interface ProjectSummary {
+  id: number;
+  name: string;
+  status: string;
+  total_teams: number;
+  created_at: string;
+  team_count: number;
+  sold_count: number;
+  unsold_count: number;
+  total_spend: number;
+  last_sale_at?: string;
 }
\ No newline at end of file